@@ -1,33 +1,96 @@
 import json
+import queue
 import shutil
+import threading
 import uuid
 from pathlib import Path
+from typing import Literal
 
-from fastapi import Depends, FastAPI, File, Form, HTTPException, UploadFile
-from fastapi.responses import HTMLResponse
+from fastapi import Depends, FastAPI, File, Form, Header, HTTPException, Request, Response, UploadFile
+from fastapi.responses import FileResponse, HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy import desc, select
 from sqlalchemy.orm import Session
 
+from app.core import tracing
 from app.core.config import get_settings
 from app.db.session import get_db
-from app.models import JobStatus, JobType, TTSJob, TrainJob, UISession, Voice, VoiceProfile, VoiceSample
-from app.schemas.api import G2PRequest, G2PResponse, JobOut, PreviewRequest, ProfileOut, SimpleJobResponse, TTSRequest, TrainRequest, UISessionPayload, VoiceCreateResponse, VoiceOut
-from app.services.audio.processing import ffmpeg_normalize, trim_and_loudnorm
+from app.models import Artifact, JobStatus, JobType, TTSJob, TrainJob, UISession, Voice, VoiceProfile, VoiceSample
+from app.schemas.api import FineTunedProfileRequest, G2PRequest, G2PResponse, JobOut, JobSummary, PreviewRequest, ProfileOut, SimpleJobResponse, TTSBatchRequest, TTSRequest, TrainRequest, UISessionPayload, VoiceCreateResponse, VoiceOut
+from app.services.audio.hls import HLS_MEDIA_TYPES, PLAYLIST_NAME, hls_dir
+from app.services.audio.processing import OUTPUT_MEDIA_TYPES, embed_from_wav, ffmpeg_normalize, trim_and_loudnorm, write_reference_array
 from app.services.text.frontend import RussianTextFrontend
-from app.services.repository import list_jobs, list_profiles, list_voices
-from app.workers.celery_app import celery_app
+from app.services import admission, metrics, model_registry, speculative_preview
+from app.services.preview_cache import PreviewCache, enqueue_default_preview, preview_key, preview_payload
+from app.services.repository import list_jobs, list_profiles, list_voices, profile_refs
+from app.services.synthesis import prepare_text, render_preview
+from app.services.text_store import expand_params, slim_params
+from app.workers.dispatch import send_task
 
 settings = get_settings()
 app = FastAPI(title='Voice AI API (XTTS)')
 app.mount('/media', StaticFiles(directory=settings.data_root), name='media')
-_g2p_frontend = RussianTextFrontend(settings.accent_overrides_path)
+# Loaded on first use or by the startup warm-up thread: ruaccent models are slow to load.
+_frontend: RussianTextFrontend | None = None
+_frontend_lock = threading.Lock()
+_preview_cache = PreviewCache(settings.previews_dir)
+# One resident XTTS per ?sync=true slot, created on first use. XTTS generation keeps per-call
+# state on the model, so a backend is never shared by two concurrent previews.
+_sync_backends: queue.SimpleQueue = queue.SimpleQueue()
+for _ in range(max(settings.api_sync_preview_concurrency, 1)):
+    _sync_backends.put(None)
+
+
+def _get_frontend() -> RussianTextFrontend:
+    global _frontend
+    with _frontend_lock:
+        if _frontend is None:
+            _frontend = RussianTextFrontend(
+                settings.accent_overrides_path,
+                accent_service=settings.accent_service_socket or None,
+                accent_fallback=settings.accent_service_fallback,
+                accent_retry_sec=settings.accent_service_retry_sec,
+            )
+    return _frontend
+
+
+def _warm_up() -> None:
+    """Load what the first requests would otherwise wait for, without holding up startup."""
+    _get_frontend()
+    import app.workers.celery_app  # noqa: F401
+    import pydub  # noqa: F401
+
+
+@app.middleware('http')
+async def trace_requests(request: Request, call_next):
+    """Server span per request, continuing an incoming traceparent; the trace id is echoed in X-Trace-Id."""
+    span = tracing.start(f'{request.method} {request.url.path}', parent=tracing.parse_traceparent(request.headers.get(tracing.TRACEPARENT)))
+    if span is None:
+        return await call_next(request)
+    token = tracing.activate(span)
+    try:
+        response = await call_next(request)
+    except Exception as exc:
+        tracing.finish(span, exc)
+        raise
+    finally:
+        tracing.deactivate(token)
+    route = request.scope.get('route')
+    if route is not None:
+        span.name = f'{request.method} {route.path}'
+    span.set(**{'http.method': request.method, 'http.target': request.url.path, 'http.status_code': response.status_code})
+    tracing.finish(span)
+    response.headers['X-Trace-Id'] = span.trace_id
+    return response
 
 
 @app.on_event('startup')
 def startup() -> None:
-    for p in [settings.uploads_dir, settings.voices_dir, settings.profiles_dir, settings.jobs_dir, settings.outputs_dir, settings.models_dir]:
+    for p in [settings.uploads_dir, settings.voices_dir, settings.profiles_dir, settings.jobs_dir, settings.outputs_dir, settings.models_dir, settings.previews_dir, settings.texts_dir]:
         Path(p).mkdir(parents=True, exist_ok=True)
+    if settings.api_warmup:
+        threading.Thread(target=_warm_up, name='api-warmup', daemon=True).start()
 
 
 @app.get('/', response_class=HTMLResponse)
@@ -40,12 +103,63 @@ def health():
     return {'status': 'ok', 'backend': 'xtts_v2'}
 
 
+@app.get('/metrics', response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render_prometheus(), media_type='text/plain; version=0.0.4')
+
+
 @app.post('/v1/g2p', response_model=G2PResponse)
 def g2p(req: G2PRequest):
-    phoneme_text = _g2p_frontend.text_to_phonemes(req.text)
+    phoneme_text = _get_frontend().text_to_phonemes(req.text)
     return G2PResponse(source_text=req.text, phoneme_text=phoneme_text)
 
 
+@app.post('/v1/g2p/batch')
+async def g2p_batch(request: Request, direction: Literal['to_phonemes', 'to_text'] = 'to_phonemes'):
+    """Convert a newline-delimited document line by line, streaming NDJSON results as input arrives.
+
+    Only one partial line is buffered, so memory stays bounded by G2P_MAX_LINE_BYTES regardless of document size.
+    """
+    max_line = settings.g2p_max_line_bytes
+    # G2P, a first ruaccent load and accent-service I/O are blocking; none of it runs on the event loop.
+    frontend = await run_in_threadpool(_get_frontend)
+    convert = frontend.text_to_phonemes if direction == 'to_phonemes' else frontend.phonemes_to_text
+
+    def emit(first_line: int, raws: list[bytes]) -> bytes:
+        out = []
+        for line_no, raw in enumerate(raws, first_line):
+            source = raw.decode('utf-8', errors='replace').rstrip('\r')
+            out.append(json.dumps({'line': line_no, 'source': source, 'result': convert(source)}, ensure_ascii=False) + '\n')
+        return ''.join(out).encode('utf-8')
+
+    async def results():
+        buffer = b''
+        line_no = 0
+        async for chunk in request.stream():
+            buffer += chunk
+            # Split on the byte: b'\n' never occurs inside a multi-byte UTF-8 sequence.
+            *lines, buffer = buffer.split(b'\n')
+            if lines:
+                # One threadpool hop per received chunk, not per line.
+                yield await run_in_threadpool(emit, line_no + 1, lines)
+                line_no += len(lines)
+            if len(buffer) > max_line:
+                yield (json.dumps({'line': line_no + 1, 'error': f'line exceeds {max_line} bytes'}) + '\n').encode('utf-8')
+                return
+        if buffer:
+            yield await run_in_threadpool(emit, line_no + 1, [buffer])
+
+    return StreamingResponse(results(), media_type='application/x-ndjson')
+
+
+def _admit(job_id: str, queue: str, payload: dict, api_key: str | None) -> admission.Decision:
+    """Admit and reserve the job under `job_id`, which the caller then uses for the new row."""
+    decision = admission.admit(job_id, queue, admission.estimate_audio_seconds(payload), api_key)
+    if not decision.allowed:
+        raise HTTPException(429, decision.detail, headers={'Retry-After': str(decision.retry_after)})
+    return decision
+
+
 def _get_or_create_ui_session(db: Session, session_id: str | None) -> UISession:
     sess = db.get(UISession, session_id) if session_id else None
     if sess:
@@ -69,11 +183,14 @@ def get_ui_session(session_id: str | None = None, db: Session = Depends(get_db))
 @app.post('/v1/ui/session')
 def update_ui_session(payload: UISessionPayload, db: Session = Depends(get_db)):
     sess = _get_or_create_ui_session(db, payload.session_id)
-    for k, v in payload.model_dump(exclude_none=True).items():
+    changes = payload.model_dump(exclude_none=True)
+    for k, v in changes.items():
         if k != 'session_id':
             setattr(sess, k, v)
     db.commit()
     db.refresh(sess)
+    if settings.speculative_preview_enabled and any(k in changes for k in speculative_preview.PREVIEW_FIELDS):
+        speculative_preview.schedule(db, sess)
     return {c.name: getattr(sess, c.name) for c in sess.__table__.columns}
 
 
@@ -86,32 +203,85 @@ def reset_ui_session(db: Session = Depends(get_db)):
     return {c.name: getattr(sess, c.name) for c in sess.__table__.columns}
 
 
-@app.get('/v1/ui/history')
-def ui_history(db: Session = Depends(get_db)):
+JOB_EXPAND_FIELDS = {'input_params', 'texts'}
+
+
+def _parse_expand(expand: str | None) -> set[str]:
+    fields = {x.strip() for x in (expand or '').split(',') if x.strip()}
+    unknown = fields - JOB_EXPAND_FIELDS
+    if unknown:
+        raise HTTPException(400, f'Unknown expand fields: {", ".join(sorted(unknown))}')
+    return fields
+
+
+def _job_params(job, expand: set[str]) -> dict:
+    return expand_params(job.input_params or {}) if 'texts' in expand else (job.input_params or {})
+
+
+def _job_summary(job, expand: set[str]) -> JobSummary:
+    params = job.input_params or {}
+    return JobSummary(
+        id=job.id,
+        type=job.type,
+        status=job.status,
+        progress=job.progress,
+        voice_id=params.get('voice_id'),
+        error_text=job.error_text,
+        output_path=job.output_path,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        input_params=_job_params(job, expand) if expand else None,
+    )
+
+
+@app.get('/v1/ui/history', response_model=list[JobSummary])
+def ui_history(expand: str | None = None, db: Session = Depends(get_db)):
+    fields = _parse_expand(expand)
     jobs = list_jobs(db)
     jobs = sorted(jobs, key=lambda x: x.updated_at, reverse=True)[:20]
-    return [JobOut(**{c.name: getattr(j, c.name) for c in j.__table__.columns}) for j in jobs]
+    return [_job_summary(j, fields) for j in jobs]
+
+
+def _render_worker(db: Session, profile_id: str | None) -> str | None:
+    """Worker already holding the profile's fine-tuned checkpoint, so it is not loaded a second time elsewhere."""
+    if not settings.model_affinity_routing or not profile_id:
+        return None
+    try:
+        checkpoint = model_registry.profile_checkpoint(db.get(VoiceProfile, profile_id))
+    except ValueError:
+        # The worker fails the job with this error; routing just falls back to the shared queue.
+        return None
+    return model_registry.preferred_worker(model_registry.checkpoint_key(checkpoint)) if checkpoint else None
 
 
 @app.post('/v1/ui/retry-job')
-def retry_job(job_id: str, db: Session = Depends(get_db)):
+def retry_job(job_id: str, db: Session = Depends(get_db), x_api_key: str | None = Header(default=None)):
     job = db.get(TTSJob, job_id) or db.get(TrainJob, job_id)
     if not job:
         raise HTTPException(404, 'Job not found')
-    params = job.input_params
+    # The new message needs the full texts; the new row gets the same slim references back.
+    params = expand_params(job.input_params)
     if isinstance(job, TrainJob):
         new_job = TrainJob(type=JobType.train, status=JobStatus.pending, input_params=params)
         db.add(new_job)
         db.commit()
-        celery_app.send_task('app.workers.tasks.run_train', args=[new_job.id, params['voice_id'], params['profile_name']])
+        send_task('app.workers.tasks.run_train', args=[new_job.id, params['voice_id'], params['profile_name']])
     else:
-        new_job = TTSJob(type=job.type, status=JobStatus.pending, input_params=params)
+        if job.type == JobType.tts:
+            # Chunks already rendered by the previous attempt are picked up via its manifest.
+            params = {**params, 'resume_job_id': job.id}
+        queue = settings.celery_preview_queue if job.type == JobType.preview else settings.celery_render_queue
+        new_id = str(uuid.uuid4())
+        _admit(new_id, queue, params, x_api_key)
+        new_job = TTSJob(id=new_id, type=job.type, status=JobStatus.pending, input_params=slim_params(params))
         db.add(new_job)
         db.commit()
         if job.type == JobType.preview:
-            celery_app.send_task('app.workers.tasks.run_preview', args=[new_job.id, params])
+            send_task('app.workers.tasks.run_preview', args=[new_job.id, params])
+        elif job.type == JobType.tts_batch:
+            send_task('app.workers.tasks.run_tts_batch', args=[new_job.id, params], worker=_render_worker(db, params.get('profile_id')))
         else:
-            celery_app.send_task('app.workers.tasks.run_tts', args=[new_job.id, params])
+            send_task('app.workers.tasks.run_tts', args=[new_job.id, params], worker=_render_worker(db, params.get('profile_id')))
     return {'job_id': new_job.id}
 
 
@@ -138,11 +308,21 @@ async def create_voice(
         normalized = target_voice_dir / f'{raw_path.stem}_norm.wav'
         ffmpeg_normalize(str(raw_path), str(normalized))
         cleaned = trim_and_loudnorm(str(normalized))
-        sample_entity = VoiceSample(voice_id=voice.id, source_path=str(raw_path), normalized_path=cleaned)
+        features = embed_from_wav(cleaned)
+        write_reference_array(cleaned)
+        sample_entity = VoiceSample(
+            voice_id=voice.id,
+            source_path=str(raw_path),
+            normalized_path=cleaned,
+            duration_sec=features['duration_sec'],
+            features=features,
+        )
         db.add(sample_entity)
         db.flush()
         sample_ids.append(sample_entity.id)
     db.commit()
+    if settings.precompute_default_preview:
+        enqueue_default_preview(db, voice.id)
     return VoiceCreateResponse(voice_id=voice.id, sample_ids=sample_ids)
 
 
@@ -159,22 +339,103 @@ def get_voice(voice_id: str, db: Session = Depends(get_db)):
     return voice
 
 
+def _acquire_sync_tts():
+    """A backend for this request's exclusive use, or None when every slot is busy; hand it back with _release_sync_tts."""
+    try:
+        tts = _sync_backends.get_nowait()
+    except queue.Empty:
+        return None
+    if tts is None:
+        try:
+            # Imported here so the API only pulls in torch when sync previews are actually used.
+            from app.services.model_pool import create_backend
+
+            tts = create_backend(settings.models_dir, prefer_fast_checkpoint=settings.xtts_use_fast_checkpoint)
+        except Exception:
+            _sync_backends.put(None)
+            raise
+    return tts
+
+
+def _release_sync_tts(tts) -> None:
+    _sync_backends.put(tts)
+
+
+def _preview_audio(job: TTSJob) -> FileResponse:
+    return FileResponse(job.output_path, media_type='audio/wav', headers={'X-Job-Id': job.id})
+
+
+def _render_preview_sync(db: Session, tts, voice_id: str, payload: dict, refs: list[str]) -> FileResponse:
+    """Synthesize a preview in the API process, recording it as a regular preview job."""
+    job = TTSJob(type=JobType.preview, status=JobStatus.running, progress=10, input_params={**payload, 'sync': True})
+    db.add(job)
+    db.commit()
+    try:
+        prepared = prepare_text(_get_frontend(), payload)
+        job.input_params = slim_params({**job.input_params, **prepared})
+        output = str(Path(settings.outputs_dir) / f'{job.id}.wav')
+        render_preview(tts, prepared['backend_text'], refs, output)
+        _preview_cache.put(voice_id, payload['preview_cache_key'], output)
+        job.status = JobStatus.done
+        job.progress = 100
+        job.output_path = output
+        db.add(Artifact(job_id=job.id, kind='preview', path=output, meta={'backend': 'xtts_v2', 'sync': True}))
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        job.status = JobStatus.failed
+        job.error_text = str(exc)
+        db.commit()
+        raise HTTPException(500, f'Preview failed: {exc}')
+    return _preview_audio(job)
+
+
 @app.post('/v1/voices/{voice_id}/preview', response_model=SimpleJobResponse)
-def preview_voice(voice_id: str, req: PreviewRequest, db: Session = Depends(get_db)):
+def preview_voice(
+    voice_id: str,
+    req: PreviewRequest,
+    sync: bool = False,
+    db: Session = Depends(get_db),
+    x_api_key: str | None = Header(default=None),
+):
+    """Queue a preview; with ?sync=true (and API_SYNC_PREVIEW enabled) answer with the wav itself when possible."""
     if not db.get(Voice, voice_id):
         raise HTTPException(404, 'Voice not found')
-    payload = {
-        'voice_id': voice_id,
-        'text': req.text,
-        'use_accenting': req.use_accenting,
-        'use_user_overrides': req.use_user_overrides,
-        'accent_mode': req.accent_mode,
-        'stress_hint_mode': req.stress_hint_mode,
-    }
-    job = TTSJob(type=JobType.preview, status=JobStatus.pending, input_params=payload)
+    payload = preview_payload(voice_id, req)
+    refs = profile_refs(db, voice_id)
+    key = preview_key(payload, refs, settings.accent_overrides_path)
+    cached = _preview_cache.get(voice_id, key)
+    if cached:
+        job = TTSJob(type=JobType.preview, status=JobStatus.done, progress=100, input_params={**payload, 'preview_cache_hit': True})
+        db.add(job)
+        db.flush()
+        output = str(Path(settings.outputs_dir) / f'{job.id}.wav')
+        shutil.copyfile(cached, output)
+        job.output_path = output
+        db.add(Artifact(job_id=job.id, kind='preview', path=output, meta={'backend': 'xtts_v2', 'cached': True}))
+        db.commit()
+        if sync:
+            return _preview_audio(job)
+        return SimpleJobResponse(job_id=job.id, status='done')
+    payload['preview_cache_key'] = key
+    # A speculative render of this very draft may already be under way; hand out that job.
+    speculative_id = speculative_preview.job_for(key) if settings.speculative_preview_enabled and not sync else None
+    speculative_job = db.get(TTSJob, speculative_id) if speculative_id else None
+    if speculative_job and speculative_job.status in (JobStatus.pending, JobStatus.running):
+        return SimpleJobResponse(job_id=speculative_job.id, status=speculative_job.status.value)
+    # Synthesize in-process only while a slot is free; otherwise fall through to the queued path.
+    tts = _acquire_sync_tts() if sync and settings.api_sync_preview else None
+    if tts is not None:
+        try:
+            return _render_preview_sync(db, tts, voice_id, payload, refs)
+        finally:
+            _release_sync_tts(tts)
+    job_id = str(uuid.uuid4())
+    _admit(job_id, settings.celery_preview_queue, payload, x_api_key)
+    job = TTSJob(id=job_id, type=JobType.preview, status=JobStatus.pending, input_params=payload)
     db.add(job)
     db.commit()
-    celery_app.send_task('app.workers.tasks.run_preview', args=[job.id, payload])
+    send_task('app.workers.tasks.run_preview', args=[job.id, payload])
     return SimpleJobResponse(job_id=job.id, status='pending')
 
 
@@ -185,41 +446,159 @@ def train_voice(voice_id: str, req: TrainRequest, db: Session = Depends(get_db))
     job = TrainJob(type=JobType.train, status=JobStatus.pending, input_params={'voice_id': voice_id, 'profile_name': req.profile_name})
     db.add(job)
     db.commit()
-    celery_app.send_task('app.workers.tasks.run_train', args=[job.id, voice_id, req.profile_name])
+    send_task('app.workers.tasks.run_train', args=[job.id, voice_id, req.profile_name])
     return SimpleJobResponse(job_id=job.id, status='pending')
 
 
+@app.post('/v1/voices/{voice_id}/profiles/finetuned', response_model=ProfileOut)
+def register_finetuned_profile(voice_id: str, req: FineTunedProfileRequest, db: Session = Depends(get_db)):
+    """Register a fine_tune_xtts.py output (or its convert_xtts_fast.py artifact) as a profile of the voice."""
+    if not db.get(Voice, voice_id):
+        raise HTTPException(404, 'Voice not found')
+    checkpoint = model_registry.allowed_checkpoint(req.checkpoint_dir)
+    # One message for every rejection, so the endpoint does not reveal which paths exist.
+    if checkpoint is None or not (checkpoint / 'config.json').is_file() or not (
+        (checkpoint / 'model.safetensors').is_file() or any(checkpoint.glob('*.pth'))
+    ):
+        raise HTTPException(400, 'checkpoint_dir must be a checkpoint directory inside FINETUNED_MODELS_DIR')
+    checkpoint = str(checkpoint)
+    profile = VoiceProfile(
+        voice_id=voice_id,
+        name=req.name,
+        status='ready',
+        model_path=checkpoint,
+        params={'legacy': False, 'backend': 'xtts_v2_finetuned', 'checkpoint': checkpoint, 'speaker_wavs': profile_refs(db, voice_id)},
+    )
+    db.add(profile)
+    db.commit()
+    return profile
+
+
 @app.get('/v1/voices/{voice_id}/profiles', response_model=list[ProfileOut])
 def get_profiles(voice_id: str, db: Session = Depends(get_db)):
     return list_profiles(db, voice_id)
 
 
 @app.post('/v1/tts', response_model=SimpleJobResponse)
-def tts(req: TTSRequest, db: Session = Depends(get_db)):
+def tts(req: TTSRequest, db: Session = Depends(get_db), x_api_key: str | None = Header(default=None)):
+    if not db.get(Voice, req.voice_id):
+        raise HTTPException(404, 'Voice not found')
+    if req.profile_id and not db.get(VoiceProfile, req.profile_id):
+        raise HTTPException(404, 'Profile not found')
+    if req.base_job_id:
+        base = db.get(TTSJob, req.base_job_id)
+        if not base or base.type != JobType.tts:
+            raise HTTPException(404, 'Base job not found')
+    payload = req.model_dump()
+    job_id = str(uuid.uuid4())
+    _admit(job_id, settings.celery_render_queue, payload, x_api_key)
+    job = TTSJob(id=job_id, type=JobType.tts, status=JobStatus.pending, input_params=slim_params(payload))
+    db.add(job)
+    db.commit()
+    send_task('app.workers.tasks.run_tts', args=[job.id, payload], worker=_render_worker(db, req.profile_id))
+    return SimpleJobResponse(job_id=job.id, status='pending')
+
+
+@app.post('/v1/tts/batch', response_model=SimpleJobResponse)
+def tts_batch(req: TTSBatchRequest, db: Session = Depends(get_db), x_api_key: str | None = Header(default=None)):
     if not db.get(Voice, req.voice_id):
         raise HTTPException(404, 'Voice not found')
     if req.profile_id and not db.get(VoiceProfile, req.profile_id):
         raise HTTPException(404, 'Profile not found')
+    if len(req.texts) > settings.tts_batch_max_items:
+        raise HTTPException(400, f'Too many texts: {len(req.texts)} > {settings.tts_batch_max_items}')
+    if any(not t.strip() for t in req.texts):
+        raise HTTPException(400, 'Empty text in batch')
     payload = req.model_dump()
-    job = TTSJob(type=JobType.tts, status=JobStatus.pending, input_params=payload)
+    job_id = str(uuid.uuid4())
+    _admit(job_id, settings.celery_render_queue, payload, x_api_key)
+    job = TTSJob(id=job_id, type=JobType.tts_batch, status=JobStatus.pending, input_params=payload)
     db.add(job)
     db.commit()
-    celery_app.send_task('app.workers.tasks.run_tts', args=[job.id, payload])
+    send_task('app.workers.tasks.run_tts_batch', args=[job.id, payload], worker=_render_worker(db, req.profile_id))
     return SimpleJobResponse(job_id=job.id, status='pending')
 
 
 @app.get('/v1/jobs/{job_id}', response_model=JobOut)
-def get_job(job_id: str, db: Session = Depends(get_db)):
+def get_job(job_id: str, expand: str | None = None, db: Session = Depends(get_db)):
+    """Full job row; large texts appear as `<field>_ref` unless requested with ?expand=texts."""
+    fields = _parse_expand(expand)
     job = db.get(TTSJob, job_id) or db.get(TrainJob, job_id)
     if not job:
         raise HTTPException(404, 'Job not found')
-    return JobOut(**{c.name: getattr(job, c.name) for c in job.__table__.columns})
-
-
-@app.get('/v1/jobs', response_model=list[JobOut])
-def get_jobs(db: Session = Depends(get_db)):
-    all_jobs = list_jobs(db)
-    return [JobOut(**{c.name: getattr(j, c.name) for c in j.__table__.columns}) for j in all_jobs]
+    playlist_url = None
+    if (hls_dir(str(Path(settings.jobs_dir) / job.id)) / PLAYLIST_NAME).is_file():
+        playlist_url = f'/v1/jobs/{job.id}/hls/{PLAYLIST_NAME}'
+    return JobOut(**{
+        **{c.name: getattr(job, c.name) for c in job.__table__.columns},
+        'input_params': _job_params(job, fields),
+        'playlist_url': playlist_url,
+    })
+
+
+@app.get('/v1/jobs/{job_id}/hls/{name}')
+def get_job_hls(job_id: str, name: str):
+    """Playlist and segments of a running or finished render; the playlist is never cached."""
+    if name != PLAYLIST_NAME and not (name.startswith('seg_') and name.endswith('.ts') and name[4:-3].isdigit()):
+        raise HTTPException(404, 'File not found')
+    path = hls_dir(str(Path(settings.jobs_dir) / job_id)) / name
+    if '/' in job_id or not path.is_file():
+        raise HTTPException(404, 'File not found')
+    ext = path.suffix.lstrip('.')
+    cache = 'no-cache' if ext == 'm3u8' else f'private, max-age={settings.media_cache_max_age}'
+    return FileResponse(path, media_type=HLS_MEDIA_TYPES[ext], headers={'Cache-Control': cache})
+
+
+def _file_response(path: Path, tag: str, request: Request) -> Response:
+    stat = path.stat()
+    etag = f'"{tag}-{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    headers = {
+        'ETag': etag,
+        'Cache-Control': f'private, max-age={settings.media_cache_max_age}',
+        'Accept-Ranges': 'bytes',
+    }
+    if etag in request.headers.get('if-none-match', ''):
+        return Response(status_code=304, headers=headers)
+    # FileResponse answers Range/If-Range requests itself (206 / multipart), so clients can seek and resume.
+    return FileResponse(
+        path,
+        media_type=OUTPUT_MEDIA_TYPES.get(path.suffix.lstrip('.'), 'application/octet-stream'),
+        filename=path.name,
+        content_disposition_type='inline',
+        headers=headers,
+    )
+
+
+@app.get('/v1/jobs/{job_id}/download')
+def download_job_output(job_id: str, request: Request, item: int | None = None, db: Session = Depends(get_db)):
+    job = db.get(TTSJob, job_id)
+    if not job:
+        raise HTTPException(404, 'Job not found')
+    if job.status != JobStatus.done or not job.output_path:
+        raise HTTPException(409, 'Job output is not ready')
+    if item is not None:
+        # Batch items are addressed by their position in the request's texts list.
+        artifacts = db.scalars(select(Artifact).where(Artifact.job_id == job.id, Artifact.kind == 'tts_batch_item')).all()
+        match = next((a for a in artifacts if (a.meta or {}).get('index') == item), None)
+        if not match:
+            raise HTTPException(404, 'Item not found')
+        path = Path(match.path)
+        tag = f'{job.id}-{item}'
+    else:
+        path = Path(job.output_path)
+        tag = job.id
+        if path.is_dir():
+            raise HTTPException(400, 'Batch job without archive: pass ?item=<index>')
+    if not path.is_file():
+        raise HTTPException(404, 'Output file is missing')
+    return _file_response(path, tag, request)
+
+
+@app.get('/v1/jobs', response_model=list[JobSummary])
+def get_jobs(expand: str | None = None, db: Session = Depends(get_db)):
+    """Job summaries; ?expand=input_params adds parameters, ?expand=input_params,texts also loads stored texts."""
+    fields = _parse_expand(expand)
+    return [_job_summary(j, fields) for j in list_jobs(db)]
 
 
 @app.post('/v1/accent-overrides')
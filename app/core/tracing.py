@@ -0,0 +1,184 @@
+"""Minimal distributed tracing: W3C traceparent propagation and an OTLP/JSON file exporter.
+
+The API opens a span per request, dispatch.send_task copies the current context into the
+Celery message headers (with the enqueue time), and workers continue the trace: a
+`queue.wait` span covers the time in the broker, a `task` span the execution, and nested
+spans the DB statements, text preparation, chunk synthesis, concat and transcode.
+
+Finished spans are appended to TRACES_DIR/spans-<date>.jsonl, one OTLP/JSON
+ExportTraceServiceRequest per line, so the files can be read by scripts/trace_report.py or
+fed to an OpenTelemetry collector (otlpjsonfile receiver) without any outside service.
+Nothing is recorded unless TRACING_ENABLED=true; span() is then a cheap no-op.
+"""
+
+import contextvars
+import json
+import os
+import secrets
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.core.config import get_settings
+
+TRACEPARENT = 'traceparent'
+ENQUEUED_AT = 'voiceai_enqueued_at'
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    attributes: dict = field(default_factory=dict)
+    end_ns: int = 0
+    error: str | None = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+
+_current: contextvars.ContextVar[Span | None] = contextvars.ContextVar('voiceai_span', default=None)
+_write_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return get_settings().tracing_enabled
+
+
+def current() -> Span | None:
+    return _current.get()
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    """(trace_id, parent span_id) from a W3C traceparent header, or None if absent/invalid."""
+    parts = (value or '').strip().split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or set(parts[1]) == {'0'}:
+        return None
+    return parts[1], parts[2]
+
+
+def inject() -> dict:
+    """Headers carrying the current span to another process (empty when not tracing)."""
+    span = current()
+    if span is None:
+        return {}
+    return {TRACEPARENT: f'00-{span.trace_id}-{span.span_id}-01', ENQUEUED_AT: time.time_ns()}
+
+
+def start(name: str, parent: tuple[str, str] | None = None, start_ns: int | None = None, **attributes) -> Span | None:
+    """Open a span under `parent` (trace_id, span_id) or the current span; None when tracing is off."""
+    if not enabled():
+        return None
+    if parent is None and current() is not None:
+        parent = (current().trace_id, current().span_id)
+    trace_id, parent_id = parent if parent else (secrets.token_hex(16), None)
+    return Span(name, trace_id, secrets.token_hex(8), parent_id, start_ns or time.time_ns(), attributes)
+
+
+def finish(span: Span | None, error: BaseException | None = None, end_ns: int | None = None) -> None:
+    if span is None:
+        return
+    span.end_ns = end_ns or time.time_ns()
+    if error is not None:
+        span.error = f'{type(error).__name__}: {error}'
+    _export(span)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Child span of the current one for the duration of the block; yields the Span (or None)."""
+    s = start(name, **attributes)
+    if s is None:
+        yield None
+        return
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as exc:
+        finish(s, exc)
+        raise
+    else:
+        finish(s)
+    finally:
+        _current.reset(token)
+
+
+def activate(s: Span | None):
+    """Make `s` the current span; returns a token for deactivate()."""
+    return _current.set(s)
+
+
+def deactivate(token) -> None:
+    _current.reset(token)
+
+
+def _attr(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+
+def _export(s: Span) -> None:
+    settings = get_settings()
+    otlp_span = {
+        'traceId': s.trace_id,
+        'spanId': s.span_id,
+        'name': s.name,
+        'kind': 1,
+        'startTimeUnixNano': str(s.start_ns),
+        'endTimeUnixNano': str(s.end_ns),
+        'attributes': [_attr(k, v) for k, v in s.attributes.items()],
+        'status': {'code': 2, 'message': s.error} if s.error else {'code': 1},
+    }
+    if s.parent_id:
+        otlp_span['parentSpanId'] = s.parent_id
+    record = {'resourceSpans': [{
+        'resource': {'attributes': [
+            _attr('service.name', settings.tracing_service_name),
+            _attr('host.name', socket.gethostname()),
+            _attr('process.pid', os.getpid()),
+        ]},
+        'scopeSpans': [{'scope': {'name': 'voiceai'}, 'spans': [otlp_span]}],
+    }]}
+    path = Path(settings.traces_dir) / f"spans-{time.strftime('%Y%m%d')}.jsonl"
+    line = json.dumps(record, ensure_ascii=False) + '\n'
+    try:
+        with _write_lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # One write() per line with O_APPEND keeps lines from different processes whole.
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line)
+    except OSError:
+        # Like metrics: a lost span must never fail the request or job.
+        pass
+
+
+def instrument_engine(engine) -> None:
+    """Record a `db` span for every SQL statement executed inside a traced context."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('voiceai_spans', []).append(start('db', statement=statement[:200]) if current() else None)
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get('voiceai_spans')
+        if stack:
+            finish(stack.pop())
+
+    @event.listens_for(engine, 'handle_error')
+    def _error(ctx):
+        stack = ctx.connection.info.get('voiceai_spans') if ctx.connection is not None else None
+        if stack:
+            finish(stack.pop(), ctx.original_exception)
@@ -0,0 +1,11 @@
+from functools import lru_cache
+
+import redis
+
+from app.core.config import get_settings
+
+
+@lru_cache(maxsize=1)
+def get_redis() -> redis.Redis:
+    # redis-py resets its connection pool when it detects a fork, so this is safe in prefork children.
+    return redis.Redis.from_url(get_settings().redis_url, decode_responses=True, socket_timeout=2)
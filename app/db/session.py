@@ -1,10 +1,12 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
+from app.core import tracing
 from app.core.config import get_settings
 
 settings = get_settings()
 engine = create_engine(settings.database_url, pool_pre_ping=True)
+tracing.instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
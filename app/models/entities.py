@@ -12,6 +12,7 @@ class JobType(str, enum.Enum):
     preview = 'preview'
     train = 'train'
     tts = 'tts'
+    tts_batch = 'tts_batch'
 
 
 class JobStatus(str, enum.Enum):
@@ -39,6 +40,7 @@ class VoiceSample(Base):
     source_path: Mapped[str] = mapped_column(String(1024))
     normalized_path: Mapped[str] = mapped_column(String(1024))
     duration_sec: Mapped[float] = mapped_column(Float, default=0)
+    features: Mapped[dict] = mapped_column(JSON, default=dict)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     voice: Mapped['Voice'] = relationship(back_populates='samples')
 
@@ -99,13 +101,15 @@ class UISession(Base):
     current_step: Mapped[int] = mapped_column(Integer, default=1)
     selected_voice_id: Mapped[str | None] = mapped_column(String(64))
     selected_profile_id: Mapped[str | None] = mapped_column(String(64))
-    preview_text_draft: Mapped[str] = mapped_column(Text, default='Привет! Это быстрый тест.')
+    preview_text_draft: Mapped[str] = mapped_column(Text, default='Привет! Это тест вашего голоса.')
     tts_text_draft: Mapped[str] = mapped_column(Text, default='')
     mode: Mapped[str] = mapped_column(String(16), default='story')
     format: Mapped[str] = mapped_column(String(8), default='wav')
     speed: Mapped[float] = mapped_column(Float, default=1.0)
     use_accenting: Mapped[bool] = mapped_column(default=True)
     use_user_overrides: Mapped[bool] = mapped_column(default=True)
+    accent_mode: Mapped[str] = mapped_column(String(32), default='auto_plus_overrides')
+    stress_hint_mode: Mapped[str] = mapped_column(String(16), default='none')
     active_preview_job_id: Mapped[str | None] = mapped_column(String(64))
     active_train_job_id: Mapped[str | None] = mapped_column(String(64))
     active_tts_job_id: Mapped[str | None] = mapped_column(String(64))
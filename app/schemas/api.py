@@ -29,7 +29,9 @@ class TTSRequest(BaseModel):
     profile_id: str | None = None
     text: str
     mode: Literal['story', 'poem'] = 'story'
-    format: Literal['wav', 'mp3'] = 'wav'
+    format: Literal['wav', 'mp3', 'opus'] = 'wav'
+    sample_rate: Literal[8000, 16000, 22050, 24000, 44100, 48000] | None = None
+    bitrate_kbps: int | None = Field(default=None, ge=6, le=320)
     speed: float = Field(default=1.0, ge=0.5, le=1.5)
     use_accenting: bool = True
     use_user_overrides: bool = True
@@ -37,6 +39,23 @@ class TTSRequest(BaseModel):
     stress_hint_mode: Literal['none', 'plus', 'plus_and_acute'] = 'none'
     input_mode: Literal['text', 'phoneme'] = 'text'
     phoneme_text: str | None = None
+    # Previous render of an earlier version of this text; unchanged chunks are reused from it.
+    base_job_id: str | None = None
+
+
+class TTSBatchRequest(BaseModel):
+    voice_id: str
+    profile_id: str | None = None
+    texts: list[str] = Field(min_length=1)
+    format: Literal['wav', 'mp3', 'opus'] = 'wav'
+    sample_rate: Literal[8000, 16000, 22050, 24000, 44100, 48000] | None = None
+    bitrate_kbps: int | None = Field(default=None, ge=6, le=320)
+    speed: float = Field(default=1.0, ge=0.5, le=1.5)
+    use_accenting: bool = True
+    use_user_overrides: bool = True
+    accent_mode: Literal['auto_plus_overrides', 'overrides_only', 'none'] = 'auto_plus_overrides'
+    stress_hint_mode: Literal['none', 'plus', 'plus_and_acute'] = 'none'
+    archive: bool = False
 
 
 class JobOut(BaseModel):
@@ -49,6 +68,21 @@ class JobOut(BaseModel):
     output_path: str | None
     created_at: datetime
     updated_at: datetime
+    # HLS playlist that grows while a render runs; None for jobs without one.
+    playlist_url: str | None = None
+
+
+class JobSummary(BaseModel):
+    id: str
+    type: str
+    status: str
+    progress: int
+    voice_id: str | None = None
+    error_text: str | None
+    output_path: str | None
+    created_at: datetime
+    updated_at: datetime
+    input_params: dict | None = None
 
 
 class PreviewRequest(BaseModel):
@@ -63,6 +97,11 @@ class TrainRequest(BaseModel):
     profile_name: str = 'xtts-profile'
 
 
+class FineTunedProfileRequest(BaseModel):
+    name: str
+    checkpoint_dir: str
+
+
 class SimpleJobResponse(BaseModel):
     job_id: str
     status: str
@@ -86,10 +125,12 @@ class UISessionPayload(BaseModel):
     tts_text_draft: str | None = None
     phoneme_text_draft: str | None = None
     mode: Literal['story', 'poem'] | None = None
-    format: Literal['wav', 'mp3'] | None = None
+    format: Literal['wav', 'mp3', 'opus'] | None = None
     speed: float | None = None
     use_accenting: bool | None = None
     use_user_overrides: bool | None = None
+    accent_mode: Literal['auto_plus_overrides', 'overrides_only', 'none'] | None = None
+    stress_hint_mode: Literal['none', 'plus', 'plus_and_acute'] | None = None
     active_preview_job_id: str | None = None
     active_train_job_id: str | None = None
     active_tts_job_id: str | None = None
@@ -0,0 +1,175 @@
+"""Admission control for synthesis queues, measured in seconds of worker time.
+
+Every accepted job reserves its estimated cost (audio seconds from text length times
+the queue's measured real-time factor) in Redis hashes: one per queue and, when the
+client sends X-API-Key, one per key. Workers release the reservation when the job
+finishes and feed the observed RTF back. Like metrics, admission fails open: when
+Redis is unavailable requests are accepted rather than rejected.
+"""
+
+import hashlib
+import math
+import time
+from dataclasses import dataclass
+
+import redis
+
+from app.core.config import get_settings
+from app.db.redis_client import get_redis
+from app.services import metrics
+
+_PREFIX = 'voiceai:admission'
+_RTF_KEY = f'{_PREFIX}:rtf'
+# Weight of the newest observation in the RTF moving average.
+_RTF_ALPHA = 0.2
+
+# KEYS: job scopes key, queue pending hash[, API key pending hash].
+# ARGV: job_id, cost, now, stale cutoff, queue limit, key quota, scopes, ttl.
+# Reservations older than the cutoff (the broker visibility timeout) are dropped while summing.
+# An idle queue (or key) always takes one job, however large, so nothing is rejected forever.
+_ADMIT_SCRIPT = """
+local function backlog(key)
+  local total = 0
+  local entries = redis.call('HGETALL', key)
+  for i = 1, #entries, 2 do
+    local sep = string.find(entries[i + 1], '|', 1, true)
+    local cost = tonumber(string.sub(entries[i + 1], 1, (sep or 0) - 1)) or 0
+    local created = sep and tonumber(string.sub(entries[i + 1], sep + 1)) or 0
+    if created < tonumber(ARGV[4]) then
+      redis.call('HDEL', key, entries[i])
+    else
+      total = total + cost
+    end
+  end
+  return total
+end
+local cost = tonumber(ARGV[2])
+local queued = backlog(KEYS[2])
+local limit = tonumber(ARGV[5])
+if limit > 0 and queued > 0 and queued + cost > limit then
+  return {'backlog', tostring(queued), '0'}
+end
+local used = 0
+if KEYS[3] then
+  used = backlog(KEYS[3])
+  local quota = tonumber(ARGV[6])
+  if quota > 0 and used > 0 and used + cost > quota then
+    return {'quota', tostring(queued), tostring(used)}
+  end
+end
+local value = ARGV[2] .. '|' .. ARGV[3]
+for i = 2, #KEYS do
+  redis.call('HSET', KEYS[i], ARGV[1], value)
+end
+redis.call('SET', KEYS[1], ARGV[7], 'EX', ARGV[8])
+return {'ok', tostring(queued), tostring(used)}
+"""
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    cost_sec: float
+    retry_after: int = 0
+    detail: str = ''
+
+
+def estimate_audio_seconds(payload: dict) -> float:
+    """Rough speech duration of a preview/tts/tts_batch payload from its character count."""
+    if payload.get('input_mode') == 'phoneme' and payload.get('phoneme_text'):
+        # Roughly one token per character in the phoneme view.
+        chars = len(payload['phoneme_text'].split())
+    elif payload.get('texts'):
+        chars = sum(len(t) for t in payload['texts'])
+    else:
+        chars = len(payload.get('text') or '')
+    return chars / get_settings().admission_chars_per_sec / max(payload.get('speed') or 1.0, 0.1)
+
+
+def _key_scope(api_key: str) -> str:
+    # Raw API keys never reach Redis.
+    return 'key:' + hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+
+def queue_rtf(queue: str) -> float:
+    try:
+        value = get_redis().hget(_RTF_KEY, queue)
+    except redis.RedisError:
+        value = None
+    return float(value) if value else get_settings().admission_default_rtf
+
+
+def observe_rtf(queue: str, synth_sec: float, audio_sec: float) -> None:
+    if audio_sec <= 0:
+        return
+    rtf = synth_sec / audio_sec
+    try:
+        previous = get_redis().hget(_RTF_KEY, queue)
+        value = rtf if previous is None else (1 - _RTF_ALPHA) * float(previous) + _RTF_ALPHA * rtf
+        get_redis().hset(_RTF_KEY, queue, value)
+    except redis.RedisError:
+        return
+    metrics.set_gauge('voiceai_queue_rtf', round(value, 4), queue=queue)
+
+
+def _queue_limit(queue: str) -> float:
+    settings = get_settings()
+    if queue == settings.celery_preview_queue:
+        return settings.admission_preview_max_backlog_sec
+    return settings.admission_render_max_backlog_sec
+
+
+def _key_limit(api_key: str) -> float:
+    settings = get_settings()
+    return settings.admission_key_quotas.get(api_key, settings.admission_key_quota_sec)
+
+
+def admit(job_id: str, queue: str, audio_sec: float, api_key: str | None = None) -> Decision:
+    """Admit a job of audio_sec under the queue backlog limit and the key's quota, reserving its cost.
+
+    Checking and reserving happen in one Lua script, so concurrent requests cannot all see
+    the same backlog and all be admitted.
+    """
+    settings = get_settings()
+    cost = audio_sec * queue_rtf(queue)
+    if not settings.admission_enabled:
+        return Decision(True, cost)
+    scopes = [f'queue:{queue}'] + ([_key_scope(api_key)] if api_key else [])
+    now = time.time()
+    try:
+        r = get_redis()
+        outcome, backlog, used = r.register_script(_ADMIT_SCRIPT)(
+            keys=[f'{_PREFIX}:job:{job_id}'] + [f'{_PREFIX}:pending:{scope}' for scope in scopes],
+            args=[
+                job_id, f'{cost:.3f}', f'{now:.0f}', now - settings.celery_visibility_timeout,
+                _queue_limit(queue), _key_limit(api_key) if api_key else 0,
+                ','.join(scopes), settings.celery_visibility_timeout,
+            ],
+        )
+    except redis.RedisError:
+        return Decision(True, cost)
+    backlog, used = float(backlog), float(used)
+    metrics.set_gauge('voiceai_admission_backlog_seconds', round(backlog, 1), queue=queue)
+    if outcome == 'backlog':
+        metrics.incr('voiceai_admission_rejected_total', queue=queue, reason='backlog')
+        return Decision(False, cost, math.ceil(backlog + cost - _queue_limit(queue)), f'Queue {queue} is over capacity, estimated wait {int(backlog)}s')
+    if outcome == 'quota':
+        metrics.incr('voiceai_admission_rejected_total', queue=queue, reason='quota')
+        return Decision(False, cost, math.ceil(used + cost - _key_limit(api_key)), 'API key quota of pending work exceeded')
+    return Decision(True, cost)
+
+
+def release(job_id: str) -> None:
+    """Drop a job's reservations; safe to call more than once."""
+    try:
+        r = get_redis()
+        scopes = r.get(f'{_PREFIX}:job:{job_id}')
+        if not scopes:
+            return
+        pipe = r.pipeline()
+        for scope in scopes.split(','):
+            pipe.hdel(f'{_PREFIX}:pending:{scope}', job_id)
+        pipe.delete(f'{_PREFIX}:job:{job_id}')
+        pipe.execute()
+    except redis.RedisError:
+        pass
@@ -0,0 +1,99 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+from app.services.audio.processing import _read_wav
+
+PLAYLIST_NAME = 'index.m3u8'
+HLS_MEDIA_TYPES = {'m3u8': 'application/vnd.apple.mpegurl', 'ts': 'video/mp2t'}
+
+
+def hls_dir(job_dir: str) -> Path:
+    return Path(job_dir) / 'hls'
+
+
+class HLSPlaylist:
+    """Growing HLS EVENT playlist of AAC/MPEG-TS segments, fed chunk by chunk while a render runs.
+
+    One ffmpeg process encodes the whole job from PCM on stdin and segments it every
+    `target_duration` seconds, so the audio is a single gapless AAC stream (separate encodes
+    per chunk would each add encoder priming silence at the chunk boundary). Each chunk is
+    written with the pauses concat_with_pauses would put around it, so players hear the same
+    rhythm as the final file. finish() ends the stream: ffmpeg flushes the last segment and
+    closes the playlist with EXT-X-ENDLIST. Call it on failure as well, or players keep polling.
+    The stream is a side channel: when the encoder fails, abort() ends it without raising and
+    the render goes on.
+    """
+
+    def __init__(self, job_dir: str, target_duration: int = 6, bitrate_kbps: int = 64, sample_rate: int = 24000):
+        self.dir = hls_dir(job_dir)
+        self.target_duration = target_duration
+        self.bitrate_kbps = bitrate_kbps
+        self.sample_rate = sample_rate
+        self.elapsed = 0.0
+        self._proc: subprocess.Popen | None = None
+
+    def reset(self) -> None:
+        """Start over (a retried job re-emits every chunk, reused or not)."""
+        self.finish()
+        shutil.rmtree(self.dir, ignore_errors=True)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.elapsed = 0.0
+        cmd = [
+            'ffmpeg', '-v', 'error', '-y', '-f', 'f32le', '-ar', str(self.sample_rate), '-ac', '1', '-i', 'pipe:0',
+            '-c:a', 'aac', '-b:a', f'{self.bitrate_kbps}k',
+            '-f', 'hls', '-hls_time', str(self.target_duration), '-hls_list_size', '0', '-hls_playlist_type', 'event',
+            '-hls_flags', 'temp_file', '-start_number', '1',
+            '-hls_segment_filename', str(self.dir / 'seg_%05d.ts'), str(self.dir / PLAYLIST_NAME),
+        ]
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    def add(self, wav_path: str, duration: float, lead_ms: int = 0, tail_ms: int = 0) -> None:
+        if self._proc is None:
+            raise RuntimeError('HLSPlaylist.add() before reset()')
+        samples, sample_rate = _read_wav(wav_path)
+        if sample_rate != self.sample_rate:
+            raise ValueError(f'{wav_path} is {sample_rate} Hz, the HLS stream is {self.sample_rate} Hz')
+        lead = np.zeros(self.sample_rate * lead_ms // 1000, dtype=np.float32)
+        tail = np.zeros(self.sample_rate * tail_ms // 1000, dtype=np.float32)
+        try:
+            self._proc.stdin.write(np.concatenate([lead, samples, tail]).astype('<f4').tobytes())
+            self._proc.stdin.flush()
+        except BrokenPipeError:
+            raise RuntimeError(f'HLS encoder exited: {self._stop()}') from None
+        self.elapsed += duration + (lead_ms + tail_ms) / 1000
+
+    def finish(self) -> None:
+        """End the stream; safe to call more than once."""
+        error = self._stop()
+        if error:
+            raise RuntimeError(f'HLS encoder failed: {error}')
+
+    def abort(self) -> None:
+        """Stop the encoder, ignoring its errors, and close the playlist so players stop polling."""
+        try:
+            self._stop()
+        except OSError:
+            pass
+        playlist = self.dir / PLAYLIST_NAME
+        try:
+            if playlist.is_file() and '#EXT-X-ENDLIST' not in playlist.read_text(encoding='utf-8'):
+                with open(playlist, 'a', encoding='utf-8') as f:
+                    f.write('#EXT-X-ENDLIST\n')
+        except OSError:
+            pass
+
+    def _stop(self) -> str | None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return None
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = proc.stderr.read().decode('utf-8', errors='replace').strip()
+        if proc.wait() == 0:
+            return None
+        return stderr or f'exit code {proc.returncode}'
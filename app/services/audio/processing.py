@@ -1,9 +1,16 @@
 import json
+import os
 import subprocess
+import wave
 from pathlib import Path
 
 import numpy as np
-from pydub import AudioSegment, effects, silence
+
+OUTPUT_MEDIA_TYPES = {'wav': 'audio/wav', 'mp3': 'audio/mpeg', 'opus': 'audio/ogg', 'zip': 'application/zip'}
+# libopus only encodes at these rates; other requested rates are rounded up.
+_OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+# Rate XTTS loads reference audio at (get_conditioning_latents load_sr).
+REFERENCE_SAMPLE_RATE = 22050
 
 
 def ffmpeg_normalize(input_path: str, output_path: str) -> None:
@@ -14,7 +21,49 @@ def ffmpeg_normalize(input_path: str, output_path: str) -> None:
     subprocess.run(cmd, check=True, capture_output=True)
 
 
+def ffmpeg_transcode(input_path: str, output_path: str, fmt: str, sample_rate: int | None = None, bitrate_kbps: int | None = None) -> None:
+    cmd = ['ffmpeg', '-y', '-i', input_path, '-ac', '1']
+    if fmt == 'opus':
+        if sample_rate:
+            sample_rate = min((r for r in _OPUS_SAMPLE_RATES if r >= sample_rate), default=48000)
+        # voip application mode tunes the encoder for speech intelligibility at low bitrates.
+        cmd += ['-c:a', 'libopus', '-application', 'voip', '-b:a', f'{bitrate_kbps or 32}k', '-f', 'ogg']
+    elif fmt == 'mp3':
+        cmd += ['-c:a', 'libmp3lame', '-b:a', f'{bitrate_kbps or 192}k']
+    elif fmt == 'wav':
+        cmd += ['-c:a', 'pcm_s16le']
+    else:
+        raise ValueError(f'Unsupported output format: {fmt}')
+    if sample_rate:
+        cmd += ['-ar', str(sample_rate)]
+    cmd.append(output_path)
+    subprocess.run(cmd, check=True, capture_output=True)
+
+
+def reference_array_path(wav_path: str) -> str:
+    """Where the model-rate float32 copy of a cleaned sample lives (next to it, by naming convention)."""
+    path = Path(wav_path)
+    return str(path.with_name(f'{path.stem}.f32_{REFERENCE_SAMPLE_RATE}.npy'))
+
+
+def write_reference_array(wav_path: str) -> str:
+    """Decode and resample a sample once, storing it as a memory-mappable mono float32 .npy."""
+    cmd = [
+        'ffmpeg', '-v', 'error', '-i', wav_path,
+        '-ac', '1', '-ar', str(REFERENCE_SAMPLE_RATE), '-f', 'f32le', '-',
+    ]
+    raw = subprocess.run(cmd, check=True, capture_output=True).stdout
+    dest = reference_array_path(wav_path)
+    tmp = f'{dest}.tmp.npy'
+    np.save(tmp, np.frombuffer(raw, dtype='<f4'))
+    os.replace(tmp, dest)
+    return dest
+
+
 def trim_and_loudnorm(path: str) -> str:
+    # pydub is imported on use: the API needs it only while ingesting uploads.
+    from pydub import AudioSegment, effects, silence
+
     audio = AudioSegment.from_file(path)
     chunks = silence.split_on_silence(audio, min_silence_len=250, silence_thresh=audio.dBFS - 18, keep_silence=80)
     if chunks:
@@ -26,6 +75,8 @@ def trim_and_loudnorm(path: str) -> str:
 
 
 def concat_with_pauses(chunks: list[str], output: str, line_pause_ms: int = 220, stanza_pause_ms: int = 550) -> str:
+    from pydub import AudioSegment
+
     merged = AudioSegment.silent(duration=1)
     for chunk in chunks:
         if chunk == '__STANZA_BREAK__':
@@ -40,15 +91,69 @@ def concat_with_pauses(chunks: list[str], output: str, line_pause_ms: int = 220,
     return output
 
 
+def wav_duration(path: str) -> float:
+    with wave.open(path, 'rb') as wf:
+        return wf.getnframes() / float(wf.getframerate())
+
+
+def _read_wav(path: str) -> tuple[np.ndarray, int]:
+    with wave.open(path, 'rb') as wf:
+        sample_rate, channels, width = wf.getframerate(), wf.getnchannels(), wf.getsampwidth()
+        raw = wf.readframes(wf.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    else:
+        samples = np.frombuffer(raw, dtype={2: '<i2', 4: '<i4'}[width]).astype(np.float32) / float(2 ** (8 * width - 1))
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, sample_rate
+
+
 def embed_from_wav(path: str) -> dict:
-    audio = AudioSegment.from_file(path)
-    samples = np.array(audio.get_array_of_samples()).astype(np.float32)
-    if samples.size == 0:
-        return {'energy': 0.0, 'pitch_hint': 0.0}
-    spec = np.fft.rfft(samples[: min(samples.size, 48000)])
-    energy = float(np.mean(np.abs(samples)))
-    pitch_hint = float(np.argmax(np.abs(spec)) / max(len(spec), 1))
-    return {'energy': energy, 'pitch_hint': pitch_hint, 'duration_sec': len(audio) / 1000.0}
+    """Duration and quality features of a reference sample, computed on whole-array frame views."""
+    samples, sample_rate = _read_wav(path)
+    duration = samples.size / sample_rate
+    frame = sample_rate // 50
+    n = samples.size // frame
+    if n == 0:
+        return {'duration_sec': round(duration, 3), 'speech_sec': 0.0, 'energy': 0.0, 'speech_ratio': 0.0,
+                'snr_db': 0.0, 'clip_ratio': 0.0, 'pitch_hint': 0.0}
+    # 20 ms frames: level per frame, speech = frames within 35 dB of the loudest one.
+    frames = samples[: n * frame].reshape(n, frame)
+    db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-12)
+    speech = db > max(float(db.max()) - 35, -60)
+    # Dominant 60-400 Hz component over the loudest 4096-sample windows.
+    win = 4096
+    m = samples.size // win
+    pitch_hint = 0.0
+    if m:
+        blocks = samples[: m * win].reshape(m, win)
+        loud = blocks[np.argsort(np.mean(blocks ** 2, axis=1))[-min(m, 16):]]
+        spectrum = np.abs(np.fft.rfft(loud * np.hanning(win), axis=1)).mean(axis=0)
+        freqs = np.fft.rfftfreq(win, 1 / sample_rate)
+        band = (freqs >= 60) & (freqs <= 400)
+        pitch_hint = float(freqs[band][np.argmax(spectrum[band])])
+    return {
+        'duration_sec': round(duration, 3),
+        'speech_sec': round(float(speech.sum()) * frame / sample_rate, 3),
+        'energy': round(float(np.mean(np.abs(samples))), 5),
+        'speech_ratio': round(float(speech.mean()), 4),
+        'snr_db': round(float(np.percentile(db, 95) - np.percentile(db, 10)), 2),
+        'clip_ratio': round(float(np.mean(np.abs(samples) >= 0.999)), 5),
+        'pitch_hint': round(pitch_hint, 1),
+    }
+
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int) -> None:
+    """Write mono float audio as 16-bit PCM, peak-normalized like Coqui's save_wav."""
+    samples = np.asarray(samples, dtype=np.float32)
+    peak = max(0.01, float(np.max(np.abs(samples)))) if samples.size else 1.0
+    pcm = (samples * (32767 / peak)).astype('<i2')
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm.tobytes())
 
 
 def save_json(path: str, data: dict) -> None:
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+MANIFEST_NAME = 'chunks.json'
+
+
+def render_params_hash(params: dict) -> str:
+    """Hash of everything besides the chunk text that changes the rendered audio."""
+    key = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def chunk_key(text: str, params_hash: str) -> str:
+    return hashlib.sha256(f'{params_hash}\n{text}'.encode('utf-8')).hexdigest()
+
+
+class ChunkManifest:
+    """Per-job record of finished chunk renders, kept next to the chunk files.
+
+    An entry is only written after its wav is fully on disk, so a worker dying
+    mid-chunk leaves nothing that a later run could mistake for finished work.
+    """
+
+    def __init__(self, job_dir: str):
+        self.job_dir = Path(job_dir)
+        self.path = self.job_dir / MANIFEST_NAME
+        self.entries: dict[str, dict] = self._read()
+
+    def _read(self) -> dict[str, dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        return data.get('chunks', {})
+
+    def _write(self) -> None:
+        self.job_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'chunks': self.entries}, ensure_ascii=False, indent=2), encoding='utf-8')
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _valid(entry: dict | None, key: str) -> bool:
+        if not entry or entry.get('key') != key:
+            return False
+        path = Path(entry.get('path', ''))
+        return path.is_file() and path.stat().st_size == entry.get('size')
+
+    def find(self, key: str) -> str | None:
+        for entry in self.entries.values():
+            if self._valid(entry, key):
+                return entry['path']
+        return None
+
+    def record(self, idx: int, key: str, path: str, text: str | None = None) -> None:
+        self.entries[str(idx)] = {'key': key, 'path': path, 'size': os.path.getsize(path), 'text': text}
+        self._write()
+
+    def texts(self) -> frozenset[str]:
+        """Chunk texts of this render, used as planner anchors when re-rendering an edited version."""
+        return frozenset(e['text'] for e in self.entries.values() if e.get('text'))
+
+    def discard(self, idx: int) -> None:
+        if self.entries.pop(str(idx), None) is not None:
+            self._write()
+
+    def restore(self, idx: int, key: str, dest: str, donors: list['ChunkManifest'] | None = None, text: str | None = None) -> bool:
+        """Return True when chunk `idx` is already rendered at `dest`, copying it from a donor job if needed."""
+        entry = self.entries.get(str(idx))
+        if self._valid(entry, key) and entry['path'] == dest:
+            return True
+        for donor in donors or []:
+            src = donor.find(key)
+            if src is None:
+                continue
+            tmp = f'{dest}.tmp'
+            # Chunk files are never modified in place (renders land via os.replace), so a hard link is safe.
+            try:
+                os.link(src, tmp)
+            except OSError:
+                shutil.copyfile(src, tmp)
+            os.replace(tmp, dest)
+            self.record(idx, key, dest, text)
+            return True
+        self.discard(idx)
+        return False
@@ -0,0 +1,55 @@
+"""Stand-in for XTTS in load tests: same interface, deterministic tones, configurable latency.
+
+Selected with TTS_BACKEND=fake. Every other stage of the pipeline (API, Redis, Celery,
+Postgres, chunk manifests, ffmpeg transcoding) runs for real, so scripts/load_test.py
+measures the system around the model without spending CPU on synthesis.
+"""
+
+import hashlib
+import time
+
+import numpy as np
+
+from app.services.tts_backend import XTTSBackend
+
+FAKE_SAMPLE_RATE = 24000
+
+
+class FakeXTTSBackend(XTTSBackend):
+    """Audio length follows the text (chars_per_sec), pitch follows its hash; sleeps latency + rtf * audio."""
+
+    def __init__(self, models_dir: str, prefer_fast_checkpoint: bool = True, checkpoint_dir: str | None = None,
+                 latency_ms: float = 50.0, rtf: float = 0.0, chars_per_sec: float = 14.0):
+        super().__init__(models_dir, prefer_fast_checkpoint=prefer_fast_checkpoint, checkpoint_dir=checkpoint_dir)
+        self.latency_sec = latency_ms / 1000.0
+        self.rtf = rtf
+        self.chars_per_sec = chars_per_sec
+
+    def _load(self):
+        self.model = self.model or object()
+        return self.model
+
+    def memory_bytes(self) -> int:
+        return 0
+
+    @property
+    def sample_rate(self) -> int:
+        return FAKE_SAMPLE_RATE
+
+    def get_conditioning(self, speaker_wavs: list[str]) -> tuple:
+        return (self._hash_paths(speaker_wavs),)
+
+    def synthesize(self, text: str, conditioning: tuple, speed: float, language: str = 'ru') -> np.ndarray:
+        return self.synthesize_batch([text], conditioning, speed, language)[0]
+
+    def synthesize_batch(self, texts: list[str], conditioning: tuple, speed: float, language: str = 'ru') -> list[np.ndarray]:
+        wavs = [self._tone(text, conditioning, speed) for text in texts]
+        # One model call per batch, as in XTTSBackend: fixed latency once, compute per audio second.
+        time.sleep(self.latency_sec + self.rtf * sum(w.size for w in wavs) / FAKE_SAMPLE_RATE)
+        return wavs
+
+    def _tone(self, text: str, conditioning: tuple, speed: float) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(f'{conditioning[0]}|{text}'.encode('utf-8')).digest()[:4], 'big')
+        seconds = max(len(text) / self.chars_per_sec / speed, 0.2)
+        t = np.arange(int(seconds * FAKE_SAMPLE_RATE), dtype=np.float32) / FAKE_SAMPLE_RATE
+        return (0.2 * np.sin(2 * np.pi * (150 + seed % 300) * t)).astype(np.float32)
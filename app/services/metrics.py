@@ -0,0 +1,74 @@
+"""Small Redis-backed metrics registry shared by the API and workers.
+
+Values live in one Redis hash so every process can update them cheaply; the API
+renders them in Prometheus text format at /metrics. Metric writes never raise:
+losing a sample is better than failing a job because Redis blinked.
+"""
+
+import os
+from pathlib import Path
+
+import redis
+
+from app.db.redis_client import get_redis
+
+METRICS_KEY = 'voiceai:metrics'
+
+
+def _field(name: str, labels: dict) -> str:
+    if not labels:
+        return name
+    inner = ','.join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return f'{name}{{{inner}}}'
+
+
+def incr(name: str, value: float = 1, **labels) -> None:
+    try:
+        get_redis().hincrbyfloat(METRICS_KEY, _field(name, labels), value)
+    except redis.RedisError:
+        pass
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    try:
+        get_redis().hset(METRICS_KEY, _field(name, labels), value)
+    except redis.RedisError:
+        pass
+
+
+def remove(name: str, **labels) -> None:
+    try:
+        get_redis().hdel(METRICS_KEY, _field(name, labels))
+    except redis.RedisError:
+        pass
+
+
+def render_prometheus() -> str:
+    try:
+        values = get_redis().hgetall(METRICS_KEY)
+    except redis.RedisError:
+        return ''
+    return ''.join(f'{field} {value}\n' for field, value in sorted(values.items()))
+
+
+def process_memory(pid: int | None = None) -> dict[str, int]:
+    """RSS, PSS and USS (private pages only) in bytes from /proc/<pid>/smaps_rollup.
+
+    USS is what a prefork child really costs: pages still shared copy-on-write with
+    the parent count towards RSS but not towards USS.
+    """
+    path = Path(f'/proc/{pid or os.getpid()}/smaps_rollup')
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        return {}
+    fields = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+            fields[parts[0][:-1]] = int(parts[1]) * 1024
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'uss': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
@@ -0,0 +1,109 @@
+"""Cross-job micro-batching of chunk synthesis inside one render worker process.
+
+With MICROBATCH_ENABLED the render worker runs several run_tts and run_tts_batch tasks as threads
+(`celery worker -P threads -c N`); instead of calling the model themselves they queue
+chunks here. One scheduler thread owns the model: it waits up to MICROBATCH_WINDOW_MS
+after the oldest pending chunk for others to arrive, takes up to MICROBATCH_MAX_SIZE chunks
+sharing that chunk's model, conditioning and speed, renders them with one
+synthesize_batch call and hands every wav back to the job that queued it.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterator
+
+from app.services import metrics
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from app.services.tts_backend import XTTSBackend
+
+
+@dataclass
+class _Chunk:
+    tts: 'XTTSBackend'
+    refs: list[str]
+    text: str
+    speed: float
+    group: tuple
+    enqueued: float = field(default_factory=time.monotonic)
+    future: Future = field(default_factory=Future)
+
+
+class MicroBatcher:
+    def __init__(self, window_ms: float, max_batch: int):
+        self.window_sec = window_ms / 1000.0
+        self.max_batch = max(max_batch, 1)
+        self._pending: list[_Chunk] = []
+        self._cv = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def submit(self, tts: 'XTTSBackend', refs: list[str], text: str, speed: float) -> Future:
+        chunk = _Chunk(tts, refs, text, speed, (id(tts), tts._hash_paths(refs), speed))
+        with self._cv:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='microbatch', daemon=True)
+                self._thread.start()
+            self._pending.append(chunk)
+            self._cv.notify()
+        return chunk.future
+
+    def map_ordered(self, tts: 'XTTSBackend', refs: list[str], texts: list[str], speed: float, lookahead: int) -> Iterator['np.ndarray']:
+        """Wavs for `texts` in order, keeping at most `lookahead` of them queued at a time.
+
+        The cap keeps one long job from filling every batch while other jobs' chunks wait.
+        """
+        queued: deque[Future] = deque()
+        upcoming = iter(texts)
+        for text in upcoming:
+            queued.append(self.submit(tts, refs, text, speed))
+            if len(queued) >= lookahead:
+                break
+        while queued:
+            wav = queued.popleft().result()
+            nxt = next(upcoming, None)
+            if nxt is not None:
+                queued.append(self.submit(tts, refs, nxt, speed))
+            yield wav
+
+    def _take_batch(self) -> list[_Chunk]:
+        with self._cv:
+            while not self._pending:
+                self._cv.wait()
+            oldest = self._pending[0]
+            deadline = oldest.enqueued + self.window_sec
+            while True:
+                same = [c for c in self._pending if c.group == oldest.group]
+                remaining = deadline - time.monotonic()
+                if len(same) >= self.max_batch or remaining <= 0:
+                    break
+                self._cv.wait(remaining)
+            batch = same[:self.max_batch]
+            taken = set(map(id, batch))
+            self._pending = [c for c in self._pending if id(c) not in taken]
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            # Chunks of a job that stopped waiting for them were cancelled while pending.
+            batch = [c for c in self._take_batch() if c.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            head = batch[0]
+            waited = sum(time.monotonic() - c.enqueued for c in batch)
+            try:
+                conditioning = head.tts.get_conditioning(head.refs)
+                wavs = head.tts.synthesize_batch([c.text for c in batch], conditioning, speed=head.speed)
+            except Exception as exc:
+                for c in batch:
+                    c.future.set_exception(exc)
+                continue
+            for c, wav in zip(batch, wavs):
+                c.future.set_result(wav)
+            metrics.incr('voiceai_microbatch_batches_total')
+            metrics.incr('voiceai_microbatch_chunks_total', len(batch))
+            metrics.incr('voiceai_microbatch_wait_seconds_total', waited)
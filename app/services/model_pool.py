@@ -0,0 +1,108 @@
+import gc
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from app.core.config import get_settings
+from app.services import metrics, model_registry
+from app.services.tts_backend import XTTSBackend
+
+
+def create_backend(models_dir: str, prefer_fast_checkpoint: bool = True, checkpoint_dir: str | None = None) -> XTTSBackend:
+    """XTTSBackend, or the latency-only stand-in when TTS_BACKEND=fake (load testing)."""
+    settings = get_settings()
+    if settings.tts_backend == 'fake':
+        from app.services.fake_backend import FakeXTTSBackend
+
+        return FakeXTTSBackend(
+            models_dir,
+            prefer_fast_checkpoint=prefer_fast_checkpoint,
+            checkpoint_dir=checkpoint_dir,
+            latency_ms=settings.fake_tts_latency_ms,
+            rtf=settings.fake_tts_rtf,
+            chars_per_sec=settings.admission_chars_per_sec,
+        )
+    return XTTSBackend(models_dir, prefer_fast_checkpoint=prefer_fast_checkpoint, checkpoint_dir=checkpoint_dir)
+
+
+class ModelPool:
+    """Loaded XTTS models of one worker process, keyed by checkpoint, evicted LRU past a RAM budget.
+
+    The model a caller asks for is never evicted to make room for itself, so a single
+    checkpoint larger than the budget still works (the pool then holds just that one).
+    Loading happens outside the pool lock: a cold load does not hold up callers of
+    resident models.
+    """
+
+    def __init__(self, models_dir: str, budget_mb: int, prefer_fast_checkpoint: bool = True, node: str | None = None):
+        self.models_dir = models_dir
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self.prefer_fast_checkpoint = prefer_fast_checkpoint
+        self.node = node
+        self._models: OrderedDict[str, XTTSBackend] = OrderedDict()
+        self._lock = threading.Lock()
+        # Checkpoints being loaded, so concurrent requests for one wait instead of loading it twice.
+        self._loading: dict[str, Future] = {}
+
+    def get(self, checkpoint_dir: str | None = None) -> XTTSBackend:
+        key = model_registry.checkpoint_key(checkpoint_dir)
+        with self._lock:
+            backend = self._models.get(key)
+            if backend is not None:
+                self._models.move_to_end(key)
+                return backend
+            loading = self._loading.get(key)
+            owner = loading is None
+            if owner:
+                loading = self._loading[key] = Future()
+        if not owner:
+            # Another thread is loading this checkpoint; resident models stay served meanwhile.
+            return loading.result()
+        try:
+            backend = create_backend(self.models_dir, prefer_fast_checkpoint=self.prefer_fast_checkpoint, checkpoint_dir=checkpoint_dir)
+            backend._load()
+        except BaseException as exc:
+            with self._lock:
+                self._loading.pop(key, None)
+            loading.set_exception(exc)
+            raise
+        with self._lock:
+            self._loading.pop(key, None)
+            self._models[key] = backend
+            metrics.incr('voiceai_model_loads_total', checkpoint=key)
+            if checkpoint_dir and self.node:
+                model_registry.add_holder(key, self.node, os.getpid())
+            self._evict(keep=key)
+            self._report()
+        loading.set_result(backend)
+        return backend
+
+    def held(self) -> list[str]:
+        with self._lock:
+            return list(self._models)
+
+    def _evict(self, keep: str) -> None:
+        while self.total_bytes() > self.budget_bytes and len(self._models) > 1:
+            key = next(k for k in self._models if k != keep)
+            self._models.pop(key)
+            metrics.incr('voiceai_model_evictions_total', checkpoint=key)
+            if key != 'stock' and self.node:
+                model_registry.remove_holder(key, self.node, os.getpid())
+        gc.collect()
+
+    def total_bytes(self) -> int:
+        return sum(b.memory_bytes() for b in self._models.values())
+
+    def _report(self) -> None:
+        labels = {'hostname': self.node or '', 'pid': os.getpid()}
+        metrics.set_gauge('voiceai_model_pool_bytes', self.total_bytes(), **labels)
+        metrics.set_gauge('voiceai_model_pool_models', len(self._models), **labels)
+
+    def release_all(self) -> None:
+        """Forget registry entries and gauges for this process (worker child shutting down)."""
+        for key in self._models:
+            if key != 'stock' and self.node:
+                model_registry.remove_holder(key, self.node, os.getpid())
+        metrics.remove('voiceai_model_pool_bytes', hostname=self.node or '', pid=os.getpid())
+        metrics.remove('voiceai_model_pool_models', hostname=self.node or '', pid=os.getpid())
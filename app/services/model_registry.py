@@ -0,0 +1,129 @@
+"""Which worker nodes hold which fine-tuned XTTS checkpoints, kept in Redis.
+
+Holders are recorded per Celery node, because a node's direct queue (`<node>.dq`) is
+consumed by all of its processes: a hash maps node -> last refresh time, and a set per
+node tracks which child pids hold the model, so the node is dropped only when the last one
+evicts it. Workers add themselves when their model pool loads a checkpoint, refresh after
+every task and leave on eviction or shutdown. The API sends a job for a fine-tuned profile
+to a fresh holder (refreshed within MODEL_HOLDER_TTL_SEC) that also answers a Celery ping,
+so a node that died recently does not strand jobs in its direct queue.
+
+With prefork concurrency above 1 any child of the node may take the task, and a child
+without the model loads it again; affinity is only exact for workers run with `-c 1`.
+Like metrics, every call fails soft when Redis is unavailable.
+"""
+
+import hashlib
+import time
+from pathlib import Path
+
+import redis
+
+from app.core.config import get_settings
+from app.db.redis_client import get_redis
+
+_PREFIX = 'voiceai:models:holders'
+
+
+def checkpoint_key(checkpoint_dir: str | None) -> str:
+    if not checkpoint_dir:
+        return 'stock'
+    return hashlib.sha256(str(Path(checkpoint_dir).resolve()).encode('utf-8')).hexdigest()[:16]
+
+
+def allowed_checkpoint(path: str) -> Path | None:
+    """The resolved checkpoint directory if it lies inside FINETUNED_MODELS_DIR, else None.
+
+    Checkpoints are unpickled by the workers, so only the operator-controlled directory is trusted.
+    """
+    root = Path(get_settings().finetuned_models_dir).resolve()
+    resolved = Path(path).resolve()
+    if resolved == root or not resolved.is_relative_to(root) or not resolved.is_dir():
+        return None
+    return resolved
+
+
+def profile_checkpoint(profile) -> str | None:
+    """Checkpoint directory of a fine-tuned profile; regular profiles point model_path at a conditioning json.
+
+    Raises ValueError for a checkpoint outside FINETUNED_MODELS_DIR rather than rendering with the stock model.
+    """
+    if profile is None or not profile.model_path or not Path(profile.model_path).is_dir():
+        return None
+    checkpoint = allowed_checkpoint(profile.model_path)
+    if checkpoint is None:
+        raise ValueError(f'Profile {profile.id} checkpoint is outside FINETUNED_MODELS_DIR')
+    return str(checkpoint)
+
+
+def _pids_key(key: str, node: str) -> str:
+    return f'{_PREFIX}:{key}:pids:{node}'
+
+
+def add_holder(key: str, node: str, pid: int) -> None:
+    try:
+        pipe = get_redis().pipeline()
+        pipe.sadd(_pids_key(key, node), pid)
+        pipe.hset(f'{_PREFIX}:{key}', node, time.time())
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def remove_holder(key: str, node: str, pid: int) -> None:
+    try:
+        r = get_redis()
+        r.srem(_pids_key(key, node), pid)
+        if not r.scard(_pids_key(key, node)):
+            r.hdel(f'{_PREFIX}:{key}', node)
+    except redis.RedisError:
+        pass
+
+
+def refresh(keys: list[str], node: str, pid: int) -> None:
+    now = time.time()
+    try:
+        pipe = get_redis().pipeline()
+        for key in keys:
+            pipe.sadd(_pids_key(key, node), pid)
+            pipe.hset(f'{_PREFIX}:{key}', node, now)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+# node -> monotonic time it last answered a ping; saves a broadcast round trip per request.
+_alive: dict[str, float] = {}
+_ALIVE_CACHE_SEC = 10.0
+
+
+def _is_alive(node: str) -> bool:
+    seen = _alive.get(node)
+    if seen is not None and time.monotonic() - seen < _ALIVE_CACHE_SEC:
+        return True
+    from app.workers.celery_app import celery_app
+
+    try:
+        replies = celery_app.control.ping(destination=[node], timeout=get_settings().model_affinity_ping_timeout_sec)
+    except Exception:
+        # Broker trouble: routing to the shared queue is always safe.
+        return False
+    if any(node in reply for reply in replies):
+        _alive[node] = time.monotonic()
+        return True
+    _alive.pop(node, None)
+    return False
+
+
+def preferred_worker(key: str) -> str | None:
+    """Most recently active node holding `key` that is fresh and answers a ping, if any."""
+    try:
+        holders = get_redis().hgetall(f'{_PREFIX}:{key}')
+    except redis.RedisError:
+        return None
+    cutoff = time.time() - get_settings().model_holder_ttl_sec
+    fresh = sorted(((float(ts), node) for node, ts in holders.items() if float(ts) >= cutoff), reverse=True)
+    for _, node in fresh:
+        if _is_alive(node):
+            return node
+    return None
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+from app.core.config import get_settings
+from app.models import JobStatus, JobType, TTSJob
+from app.schemas.api import PreviewRequest
+from app.services.repository import profile_refs
+from app.workers.dispatch import send_task
+
+PREVIEW_OPTION_KEYS = ('text', 'use_accenting', 'use_user_overrides', 'accent_mode', 'stress_hint_mode')
+
+
+def preview_payload(voice_id: str, req: PreviewRequest) -> dict:
+    return {'voice_id': voice_id, **{k: getattr(req, k) for k in PREVIEW_OPTION_KEYS}}
+
+
+def preview_key(payload: dict, refs: list[str], overrides_path: str) -> str:
+    """Identify a preview render by its options, reference samples and accent overrides version."""
+    overrides = Path(overrides_path)
+    key = {
+        'options': {k: payload.get(k) for k in PREVIEW_OPTION_KEYS},
+        'refs': sorted(refs),
+        'overrides_mtime': overrides.stat().st_mtime_ns if overrides.exists() else 0,
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class PreviewCache:
+    """Rendered previews per voice, keyed by preview_key so changed samples or overrides never match.
+
+    Each voice keeps at most `max_per_voice` previews; the least recently used (by mtime,
+    refreshed on every hit) are dropped when a new one is stored.
+    """
+
+    def __init__(self, root: str, max_per_voice: int | None = None):
+        self.root = Path(root)
+        self.max_per_voice = get_settings().preview_cache_max_per_voice if max_per_voice is None else max_per_voice
+
+    def get(self, voice_id: str, key: str) -> str | None:
+        path = self.root / voice_id / f'{key}.wav'
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return str(path)
+
+    def put(self, voice_id: str, key: str, wav_path: str) -> str:
+        voice_dir = self.root / voice_id
+        voice_dir.mkdir(parents=True, exist_ok=True)
+        dest = voice_dir / f'{key}.wav'
+        tmp = voice_dir / f'{key}.tmp.wav'
+        shutil.copyfile(wav_path, tmp)
+        os.replace(tmp, dest)
+        self._prune(voice_dir)
+        return str(dest)
+
+    def _prune(self, voice_dir: Path) -> None:
+        if self.max_per_voice <= 0:
+            return
+        entries = []
+        for path in voice_dir.glob('*.wav'):
+            if path.name.endswith('.tmp.wav'):
+                continue
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                # Removed by a concurrent prune.
+                continue
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_per_voice:]:
+            path.unlink(missing_ok=True)
+
+    def invalidate(self, voice_id: str) -> None:
+        shutil.rmtree(self.root / voice_id, ignore_errors=True)
+
+
+def enqueue_default_preview(db, voice_id: str) -> TTSJob:
+    """Render the default PreviewRequest phrase in the background so the first preview is instant."""
+    settings = get_settings()
+    payload = preview_payload(voice_id, PreviewRequest())
+    payload['preview_cache_key'] = preview_key(payload, profile_refs(db, voice_id), settings.accent_overrides_path)
+    job = TTSJob(type=JobType.preview, status=JobStatus.pending, input_params={**payload, 'precompute': True})
+    db.add(job)
+    db.commit()
+    send_task('app.workers.tasks.run_preview', args=[job.id, payload])
+    return job
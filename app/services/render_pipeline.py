@@ -0,0 +1,165 @@
+"""Three-stage producer/consumer pipeline used by run_tts.
+
+Stage one (a thread) prepares text and yields chunks, stage two (a thread) synthesizes them,
+stage three (the calling thread, which owns the DB session) writes, records and encodes
+them. Bounded queues between the stages let chunk n+1 be accented while chunk n is
+synthesized and chunk n-1 encoded, without the frontend running arbitrarily far ahead.
+
+When the run stops early (a stage failed, or the consumer raised) both threads are joined
+before run() returns, and outputs of the synthesis stage that were never consumed are handed
+to `discard`, so work queued elsewhere on their behalf can be cancelled.
+
+Each stage accounts its busy time and the time it spent blocked waiting for input or for
+room downstream; `stats()` turns that into per-stage utilization of the wall time.
+"""
+
+import contextvars
+import queue
+import threading
+import time
+from typing import Callable, Iterable
+
+_DONE = object()
+
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.wait_in = 0.0
+        self.wait_out = 0.0
+
+    def as_dict(self, wall: float) -> dict:
+        return {
+            'items': self.items,
+            'busy_sec': round(self.busy, 3),
+            'wait_in_sec': round(self.wait_in, 3),
+            'wait_out_sec': round(self.wait_out, 3),
+            'utilization': round(self.busy / wall, 3) if wall > 0 else 0.0,
+        }
+
+
+class _Failed:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+class RenderPipeline:
+    def __init__(self, depth: int = 2, synth_depth: int | None = None):
+        self.stop = threading.Event()
+        self._q1: queue.Queue = queue.Queue(maxsize=max(depth, 1))
+        self._q2: queue.Queue = queue.Queue(maxsize=max(synth_depth or depth, 1))
+        self.stages = {name: StageStats(name) for name in ('frontend', 'synthesis', 'post')}
+        self.wall = 0.0
+        self._discard: Callable | None = None
+
+    def _put(self, q: queue.Queue, item, stats: StageStats) -> bool:
+        started = time.perf_counter()
+        try:
+            while not self.stop.is_set():
+                try:
+                    q.put(item, timeout=0.2)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stats.wait_out += time.perf_counter() - started
+
+    def _get(self, q: queue.Queue, stats: StageStats):
+        started = time.perf_counter()
+        item = q.get()
+        stats.wait_in += time.perf_counter() - started
+        return item
+
+    def _produce(self, source: Iterable) -> None:
+        stats = self.stages['frontend']
+        it = iter(source)
+        try:
+            while True:
+                started = time.perf_counter()
+                item = next(it, _DONE)
+                stats.busy += time.perf_counter() - started
+                if item is _DONE:
+                    break
+                stats.items += 1
+                if not self._put(self._q1, item, stats):
+                    return
+        except BaseException as exc:
+            self._put(self._q1, _Failed(exc), stats)
+            return
+        self._put(self._q1, _DONE, stats)
+
+    def _transform(self, fn: Callable) -> None:
+        stats = self.stages['synthesis']
+        while True:
+            item = self._get(self._q1, stats)
+            if item is _DONE or isinstance(item, _Failed):
+                self._put(self._q2, item, stats)
+                return
+            if self.stop.is_set():
+                return
+            started = time.perf_counter()
+            try:
+                out = fn(item)
+            except BaseException as exc:
+                self._put(self._q2, _Failed(exc), stats)
+                return
+            finally:
+                stats.busy += time.perf_counter() - started
+            stats.items += 1
+            if not self._put(self._q2, out, stats):
+                self._drop(out)
+                return
+
+    def _drop(self, item) -> None:
+        if self._discard is not None and item is not _DONE and not isinstance(item, _Failed):
+            self._discard(item)
+
+    def run(self, source: Iterable, transform: Callable, consume: Callable, discard: Callable | None = None) -> None:
+        """Drive source -> transform -> consume to completion; re-raises the first stage error."""
+        started = time.perf_counter()
+        self._discard = discard
+        # Threads inherit the caller's context so tracing spans nest under the task span.
+        threads = [
+            threading.Thread(target=contextvars.copy_context().run, args=(self._produce, source), name='render-frontend', daemon=True),
+            threading.Thread(target=contextvars.copy_context().run, args=(self._transform, transform), name='render-synthesis', daemon=True),
+        ]
+        for t in threads:
+            t.start()
+        stats = self.stages['post']
+        try:
+            while True:
+                item = self._get(self._q2, stats)
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failed):
+                    raise item.exc
+                t0 = time.perf_counter()
+                try:
+                    consume(item)
+                finally:
+                    stats.busy += time.perf_counter() - t0
+                stats.items += 1
+        finally:
+            self.stop.set()
+            # Unblock a stage waiting on input so it can see the stop flag.
+            for q in (self._q1, self._q2):
+                try:
+                    q.put_nowait(_DONE)
+                except queue.Full:
+                    pass
+            # Neither stage outlives the run: a chunk being synthesized is finished, not abandoned.
+            for t in threads:
+                t.join()
+            while True:
+                try:
+                    item = self._q2.get_nowait()
+                except queue.Empty:
+                    break
+                self._drop(item)
+            self.wall = time.perf_counter() - started
+
+    def stats(self) -> dict:
+        return {name: s.as_dict(self.wall) for name, s in self.stages.items()}
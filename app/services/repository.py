@@ -1,6 +1,14 @@
+import logging
+import math
+from pathlib import Path
+
 from sqlalchemy import select
 
+from app.core.config import get_settings
 from app.models import TTSJob, TrainJob, Voice, VoiceProfile, VoiceSample
+from app.services.audio.processing import embed_from_wav, reference_array_path, write_reference_array
+
+logger = logging.getLogger(__name__)
 
 
 def list_voices(db):
@@ -23,3 +31,75 @@ def list_jobs(db):
     tts = db.execute(select(TTSJob)).scalars().all()
     trn = db.execute(select(TrainJob)).scalars().all()
     return tts + trn
+
+
+def reference_paths(db, voice_id: str, profile_id: str | None = None) -> list[str]:
+    if profile_id:
+        profile = db.get(VoiceProfile, profile_id)
+        if profile and profile.params.get('speaker_wavs'):
+            return profile.params['speaker_wavs']
+    samples = db.execute(select(VoiceSample).where(VoiceSample.voice_id == voice_id)).scalars().all()
+    return select_references(samples, get_settings().reference_budget_sec)
+
+
+def backfill_samples(db, voice_id: str) -> None:
+    """Fill in features and model-rate arrays for samples ingested before they were produced."""
+    samples = db.execute(select(VoiceSample).where(VoiceSample.voice_id == voice_id)).scalars().all()
+    missing = [s for s in samples if not s.features]
+    for sample in samples:
+        try:
+            if not sample.features:
+                sample.features = embed_from_wav(sample.normalized_path)
+                sample.duration_sec = sample.features['duration_sec']
+            if not Path(reference_array_path(sample.normalized_path)).is_file():
+                write_reference_array(sample.normalized_path)
+        except Exception as exc:
+            logger.warning('Cannot backfill sample %s: %s', sample.id, exc)
+    if missing:
+        db.commit()
+
+
+def profile_refs(db, voice_id: str, profile_id: str | None = None) -> list[str]:
+    """Reference set a render uses; every caller that keys on it (preview cache, sync previews) must use this too.
+
+    Selection depends on sample features, so legacy samples are backfilled first.
+    """
+    backfill_samples(db, voice_id)
+    return reference_paths(db, voice_id, profile_id)
+
+
+def _sample_quality(features: dict) -> float:
+    snr = min(features.get('snr_db', 0.0) / 30.0, 1.0)
+    return 0.5 * snr + 0.5 * features.get('speech_ratio', 0.0) - 10.0 * features.get('clip_ratio', 0.0)
+
+
+def select_references(samples: list[VoiceSample], budget_sec: float) -> list[str]:
+    """Pick the cleanest, most varied samples whose speech fits into budget_sec.
+
+    Greedy max-marginal-relevance: quality minus similarity (by pitch) to what is already picked.
+    Samples without stored features (ingested before they existed) disable selection.
+    """
+    if budget_sec <= 0 or not samples or any(not s.features for s in samples):
+        return [s.normalized_path for s in samples]
+    quality = {s.id: _sample_quality(s.features) for s in samples}
+    picked: list[VoiceSample] = []
+    used = 0.0
+    candidates = list(samples)
+    while candidates:
+        def gain(s: VoiceSample) -> float:
+            pitch = s.features.get('pitch_hint', 0.0)
+            overlap = max((math.exp(-abs(pitch - p.features.get('pitch_hint', 0.0)) / 30.0) for p in picked), default=0.0)
+            return quality[s.id] - 0.5 * overlap
+
+        fitting = [s for s in candidates if used + s.features.get('speech_sec', s.duration_sec) <= budget_sec]
+        if not fitting:
+            break
+        best = max(fitting, key=gain)
+        picked.append(best)
+        used += best.features.get('speech_sec', best.duration_sec)
+        candidates.remove(best)
+    if not picked:
+        # Every sample alone exceeds the budget: XTTS trims long references itself, keep the best one.
+        picked = [max(samples, key=lambda s: quality[s.id])]
+    keep = {s.id for s in picked}
+    return [s.normalized_path for s in samples if s.id in keep]
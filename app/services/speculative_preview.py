@@ -0,0 +1,183 @@
+"""Speculative preview renders of the wizard's UI session draft.
+
+With SPECULATIVE_PREVIEW_ENABLED, every POST /v1/ui/session that touches the preview draft,
+the voice or the accent settings stores the draft (its preview_key, payload and the time it
+last changed) as the session's current one in Redis. Each session has at most one task in
+flight, in two hops:
+
+- check_speculative_preview is the debounce timer, sent with a countdown. The worker holds
+  ETA messages in memory, so no process waits while the countdown runs. When it fires it
+  reads the draft; a draft younger than SPECULATIVE_PREVIEW_DEBOUNCE_MS re-arms the timer
+  for the remainder, a stable one is handed on.
+- run_speculative_preview renders, sent without a countdown at the lowest broker priority.
+  ETA tasks skip the broker's priority ordering once due, which is why only the cheap timer
+  uses one and the render never does.
+
+A draft that is cached already, or over the session's SPECULATIVE_PREVIEW_MAX_PER_HOUR, is
+dropped without touching the model. When the render ends it re-arms the timer if the draft
+changed meanwhile. The wav lands in the PreviewCache, so a Preview click with the same
+options is answered from there, or adopts the speculative job while it is still running.
+
+Ordering: kombu's Redis transport serves priority 0 first, and a Preview click is sent
+without a priority (0). While the preview queue has a backlog, every queued click runs
+before any speculative render, and a speculative render only starts once the queue has
+drained. With one task per session at most, a backlog holds one speculative message per
+active session however much is typed. A render that waited behind the backlog re-reads the
+current draft, so what it renders is never stale.
+
+Unlike admission this fails closed: without Redis nothing speculative is scheduled or run.
+"""
+
+import json
+import time
+
+import redis
+
+from app.core.config import get_settings
+from app.db.redis_client import get_redis
+from app.schemas.api import PreviewRequest
+from app.services import metrics
+from app.services.preview_cache import PreviewCache, preview_key, preview_payload
+from app.services.repository import profile_refs
+from app.workers.dispatch import send_task
+
+_PREFIX = 'voiceai:speculative'
+_TTL = 3600
+# Lowest priority on kombu's Redis transport; speculative work goes behind everything.
+PRIORITY = 9
+# UI session fields a preview render depends on.
+PREVIEW_FIELDS = ('selected_voice_id', 'preview_text_draft', 'use_accenting', 'use_user_overrides', 'accent_mode', 'stress_hint_mode')
+
+
+def session_payload(sess) -> dict | None:
+    """The preview payload a Preview click would send for this session, or None if incomplete."""
+    if not sess.selected_voice_id or not (sess.preview_text_draft or '').strip():
+        return None
+    req = PreviewRequest(
+        text=sess.preview_text_draft,
+        use_accenting=sess.use_accenting,
+        use_user_overrides=sess.use_user_overrides,
+        accent_mode=sess.accent_mode,
+        stress_hint_mode=sess.stress_hint_mode,
+    )
+    return preview_payload(sess.selected_voice_id, req)
+
+
+def _draft(r, session_id: str) -> dict:
+    """Current draft of the session: {'key', 'payload', 'since'}; key is '' when there is none."""
+    return r.hgetall(f'{_PREFIX}:session:{session_id}')
+
+
+def _arm(session_id: str, delay_sec: float) -> None:
+    send_task('app.workers.tasks.check_speculative_preview', args=[session_id], countdown=max(delay_sec, 0.0))
+
+
+def send_render(session_id: str) -> None:
+    send_task('app.workers.tasks.run_speculative_preview', args=[session_id], priority=PRIORITY)
+
+
+def _kick(r, session_id: str) -> bool:
+    """Send a task for the session unless one is already queued or running."""
+    # Short expiry: a worker lost mid-task must not block the session's renders for long.
+    if not r.set(f'{_PREFIX}:pending:{session_id}', '1', nx=True, ex=600):
+        return False
+    _arm(session_id, get_settings().speculative_preview_debounce_ms / 1000.0)
+    metrics.incr('voiceai_speculative_preview_total', outcome='scheduled')
+    return True
+
+
+def schedule(db, sess) -> str | None:
+    """Record the session's draft for a debounced speculative render; returns its preview key."""
+    settings = get_settings()
+    payload = session_payload(sess)
+    refs = profile_refs(db, payload['voice_id']) if payload else []
+    key = preview_key(payload, refs, settings.accent_overrides_path) if refs else ''
+    state_key = f'{_PREFIX}:session:{sess.id}'
+    try:
+        r = get_redis()
+        if r.hget(state_key, 'key') == key:
+            return None
+        # Replacing the current draft is what cancels renders of earlier ones.
+        if key:
+            payload['preview_cache_key'] = key
+        r.hset(state_key, mapping={'key': key, 'payload': json.dumps(payload or {}), 'since': time.time()})
+        r.expire(state_key, _TTL)
+        if not key or PreviewCache(settings.previews_dir).get(payload['voice_id'], key):
+            return None
+        _kick(r, sess.id)
+    except redis.RedisError:
+        return None
+    return key
+
+
+def stable_draft(session_id: str) -> tuple[str, dict, str] | None:
+    """Called by the worker: (key, payload, since) of a draft unchanged for the debounce.
+
+    None means there is nothing to do now: the session's task was released, or the timer
+    was re-armed for the rest of the debounce. Nothing here sleeps.
+    """
+    try:
+        r = get_redis()
+        draft = _draft(r, session_id)
+        if not draft.get('key'):
+            release(session_id, draft.get('since'))
+            return None
+        remaining = float(draft['since']) + get_settings().speculative_preview_debounce_ms / 1000.0 - time.time()
+        if remaining > 0:
+            _arm(session_id, remaining)
+            return None
+    except redis.RedisError:
+        return None
+    return draft['key'], json.loads(draft['payload']), draft['since']
+
+
+def claim(session_id: str, key: str, voice_id: str) -> bool:
+    """Called by the worker: True when `key` is still current, not cached yet and within the cap."""
+    settings = get_settings()
+    if PreviewCache(settings.previews_dir).get(voice_id, key):
+        return False
+    try:
+        r = get_redis()
+        if _draft(r, session_id).get('key') != key:
+            metrics.incr('voiceai_speculative_preview_total', outcome='superseded')
+            return False
+        count_key = f'{_PREFIX}:count:{session_id}'
+        count = r.incr(count_key)
+        if count == 1:
+            r.expire(count_key, _TTL)
+    except redis.RedisError:
+        return False
+    if count > settings.speculative_preview_max_per_hour:
+        metrics.incr('voiceai_speculative_preview_total', outcome='capped')
+        return False
+    metrics.incr('voiceai_speculative_preview_total', outcome='rendered')
+    return True
+
+
+def release(session_id: str, since: str | None) -> None:
+    """Called when the session's task ends; sends a new one if the draft changed after `since`."""
+    try:
+        r = get_redis()
+        r.delete(f'{_PREFIX}:pending:{session_id}')
+        # schedule() writes the draft before trying to send, so either it sent a task after
+        # the delete above or its newer draft is visible here.
+        draft = _draft(r, session_id)
+        if draft.get('key') and draft.get('since') != since:
+            _kick(r, session_id)
+    except redis.RedisError:
+        pass
+
+
+def remember_job(key: str, job_id: str) -> None:
+    try:
+        get_redis().set(f'{_PREFIX}:job:{key}', job_id, ex=600)
+    except redis.RedisError:
+        pass
+
+
+def job_for(key: str) -> str | None:
+    """Id of the speculative preview job rendering `key`, if one was started."""
+    try:
+        return get_redis().get(f'{_PREFIX}:job:{key}')
+    except redis.RedisError:
+        return None
@@ -0,0 +1,65 @@
+"""Text preparation and preview rendering shared by the Celery workers and the API's sync preview path."""
+
+import re
+from typing import TYPE_CHECKING
+
+from app.services.text.frontend import RussianTextFrontend
+
+if TYPE_CHECKING:
+    # torch is only imported where a model is actually loaded.
+    from app.services.tts_backend import XTTSBackend
+
+
+def decode_input(frontend: RussianTextFrontend, payload: dict) -> str | None:
+    """Plain text decoded from `phoneme_text` in phoneme mode, else None."""
+    if payload.get('input_mode', 'text') != 'phoneme':
+        return None
+    if not payload.get('phoneme_text'):
+        raise RuntimeError('phoneme_text is required when input_mode=phoneme')
+    return frontend.phonemes_to_text(payload['phoneme_text'])
+
+
+def prepare_text(frontend: RussianTextFrontend, payload: dict) -> dict:
+    """Run the accent/stress pipeline for a preview or tts payload.
+
+    Returns the fields recorded in the job's input_params; `backend_text` is what XTTS receives.
+    """
+    input_mode = payload.get('input_mode', 'text')
+    decoded_text = decode_input(frontend, payload)
+    # Even in phoneme mode, keep accent pipeline active so user overrides
+    # and manual stress settings from UI are not silently ignored.
+    prepared = frontend.preprocess(
+        decoded_text if input_mode == 'phoneme' else payload['text'],
+        payload.get('use_accenting', True),
+        payload.get('use_user_overrides', True),
+        payload.get('accent_mode', 'auto_plus_overrides'),
+    )
+    stress_hint_mode = payload.get('stress_hint_mode', 'none')
+    return {
+        'input_mode': input_mode,
+        'decoded_phoneme_text': decoded_text,
+        'prepared_text': prepared,
+        'backend_text': frontend.to_tts_stress_format(prepared, mode=stress_hint_mode),
+        'stress_hint_mode': stress_hint_mode,
+    }
+
+
+def split_blocks(text: str, block_chars: int) -> list[str]:
+    """Sentence-aligned slices of `text` of about `block_chars` (a longer sentence stays whole)."""
+    blocks: list[str] = []
+    current = ''
+    for sentence in re.split(r'(?<=[.!?])\s+', text.strip()):
+        if current and len(current) + 1 + len(sentence) > block_chars:
+            blocks.append(current)
+            current = sentence
+        else:
+            current = f'{current} {sentence}' if current else sentence
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+def render_preview(tts: 'XTTSBackend', backend_text: str, refs: list[str], output_wav: str) -> None:
+    if not refs:
+        raise RuntimeError('No reference samples for preview')
+    tts.tts_to_file(text=backend_text, output_wav=output_wav, speed=1.0, speaker_wavs=refs)
@@ -0,0 +1,177 @@
+"""One shared ruaccent instance for all API and worker processes, served over a Unix socket.
+
+Run it with `python -m app.services.text.accent_service` (systemd/voice-accent.service) and
+set ACCENT_SERVICE_SOCKET; RussianTextFrontend then accents through AccentClient instead of
+loading its own models. The protocol is one JSON object per line in each direction:
+{"text": ...} -> {"text": ...} or {"error": ...}.
+
+Connections are handled by threads but only one thread touches the model: it collects
+requests for up to ACCENT_SERVICE_WINDOW_MS, joins up to ACCENT_SERVICE_BATCH of them into
+a single accenter call and splits the result back, so sentences from concurrent jobs are
+accented together. Each split part must match its input once stress marks are removed;
+the first batch that does not turns joining off for the life of the service and every
+later text is accented on its own.
+"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+logger = logging.getLogger('voiceai.accent_service')
+# Texts in a joined batch are separated by a blank line, which ruaccent passes through.
+_SEPARATOR = '\n\n'
+
+
+class _Batcher:
+    def __init__(self, accent, max_batch: int, window_ms: float):
+        self.accent = accent
+        self.max_batch = max(max_batch, 1)
+        self.window_sec = window_ms / 1000.0
+        self._pending: list[tuple[str, Future]] = []
+        self._cv = threading.Condition()
+        self._join = True
+        threading.Thread(target=self._run, name='accent-batcher', daemon=True).start()
+
+    def submit(self, text: str) -> Future:
+        future: Future = Future()
+        with self._cv:
+            self._pending.append((text, future))
+            self._cv.notify()
+        return future
+
+    def _take(self) -> list[tuple[str, Future]]:
+        with self._cv:
+            while not self._pending:
+                self._cv.wait()
+            deadline = time.monotonic() + self.window_sec
+            while len(self._pending) < self.max_batch and (remaining := deadline - time.monotonic()) > 0:
+                self._cv.wait(remaining)
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take()
+            texts = [t for t, _ in batch]
+            try:
+                results = self._accent_batch(texts)
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _accent_batch(self, texts: list[str]) -> list[str]:
+        if self._join and len(texts) > 1 and not any(_SEPARATOR in t for t in texts):
+            parts = self.accent(_SEPARATOR.join(texts)).split(_SEPARATOR)
+            if len(parts) == len(texts) and all(_unmarked(p) == _unmarked(t) for p, t in zip(parts, texts)):
+                return parts
+            # The originals are re-accented below, never the joined output.
+            self._join = False
+            logger.warning('Joined batch of %d did not split back cleanly, accenting texts one by one from now on', len(texts))
+        return [self.accent(t) for t in texts]
+
+
+def _unmarked(text: str) -> str:
+    """Text without the stress marks and ё restoration an accenter adds."""
+    return text.replace('+', '').replace('ё', 'е').replace('Ё', 'Е')
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                text = json.loads(line)['text']
+                reply = {'text': self.server.batcher.submit(text).result()}
+            except Exception as exc:
+                reply = {'error': f'{type(exc).__name__}: {exc}'}
+            self.wfile.write(json.dumps(reply, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # Every API process and worker child keeps a connection; a short backlog refuses bursts.
+    request_queue_size = 256
+
+
+class AccentClient:
+    """Callable `text -> accented text` talking to the service; one connection per thread.
+
+    Raises OSError when the service cannot be reached, so the caller can fall back.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            # Blocking connect: with a timeout set, a full Unix backlog fails at once with EAGAIN.
+            sock.connect(self.socket_path)
+            sock.settimeout(self.timeout)
+            conn = self._local.conn = (sock, sock.makefile('rb'))
+        return conn
+
+    def _close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn is not None:
+            conn[1].close()
+            conn[0].close()
+
+    def __call__(self, text: str) -> str:
+        payload = json.dumps({'text': text}, ensure_ascii=False).encode('utf-8') + b'\n'
+        # One retry on a fresh connection covers a service restart between calls.
+        for attempt in (0, 1):
+            try:
+                sock, reader = self._connection()
+                sock.sendall(payload)
+                line = reader.readline()
+                if not line:
+                    raise ConnectionResetError('accent service closed the connection')
+                break
+            except OSError:
+                self._close()
+                if attempt:
+                    raise
+        reply = json.loads(line)
+        if 'error' in reply:
+            raise RuntimeError(reply['error'])
+        return reply['text']
+
+
+def main() -> int:
+    from app.core.config import get_settings
+    from app.services.text.frontend import RussianTextFrontend
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    settings = get_settings()
+    path = Path(settings.accent_service_socket or '/run/voice-ai/accent.sock')
+    accent = RussianTextFrontend._build_accenter()
+    if accent is None:
+        raise SystemExit('ruaccent is not available')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        path.unlink()
+    server = _Server(str(path), _Handler)
+    server.batcher = _Batcher(accent, settings.accent_service_batch, settings.accent_service_window_ms)
+    # Group-writable so API and workers (same group) can connect.
+    os.chmod(path, 0o660)
+    logger.info('Accent service listening on %s', path)
+    server.serve_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,21 +1,108 @@
 import json
+import logging
 import re
+import threading
+import time
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+_G2P_CHAR_TO_TOKEN = {
+    'а': 'A', 'б': 'B', 'в': 'V', 'г': 'G', 'д': 'D', 'е': 'E', 'ё': 'YO', 'ж': 'ZH', 'з': 'Z',
+    'и': 'I', 'й': 'J', 'к': 'K', 'л': 'L', 'м': 'M', 'н': 'N', 'о': 'O', 'п': 'P', 'р': 'R',
+    'с': 'S', 'т': 'T', 'у': 'U', 'ф': 'F', 'х': 'H', 'ц': 'TS', 'ч': 'CH', 'ш': 'SH',
+    'щ': 'SCH', 'ъ': 'HARD', 'ы': 'Y', 'ь': 'SOFT', 'э': 'EH', 'ю': 'YU', 'я': 'YA',
+}
+_G2P_VOWELS = frozenset('аеёиоуыэюя')
+_ACUTE = '\u0301'
+# Control chars reserved as markers while decoding; stripped from input beforehand.
+_G2P_STRESS = '\x01'
+_G2P_OPEN = '\x02'
+_G2P_CLOSE = '\x03'
+_G2P_MARKERS = (_G2P_STRESS, _G2P_OPEN, _G2P_CLOSE)
+_G2P_ENCODE = {
+    **_G2P_CHAR_TO_TOKEN,
+    **{ch.upper(): token for ch, token in _G2P_CHAR_TO_TOKEN.items()},
+    _ACUTE: '+',
+}
+_G2P_DECODE = {
+    **{token: ch for ch, token in _G2P_CHAR_TO_TOKEN.items()},
+    '|': ' ',
+    '+': _G2P_STRESS,
+}
+_PUNCT_SPACE_RE = re.compile(r'\s+(?=[,.;:!?])')
+_PUNCT_GAP_RE = re.compile(r'([,.;:!?])(\S)')
+
+
+def _strip_markers(text: str) -> str:
+    for marker in _G2P_MARKERS:
+        if marker in text:
+            text = text.replace(marker, '')
+    return text
+
+
+def _resolve_stress(text: str) -> str:
+    """Turn '+' markers into acute accents: after a preceding vowel, else on the following vowel.
+
+    The Python loop runs once per marker run, not per character.
+    """
+    parts = re.split(f'({_G2P_STRESS}+)', text)
+    out = [parts[0]]
+    last = parts[0][-1:]
+    for i in range(1, len(parts), 2):
+        run, nxt = parts[i], parts[i + 1]
+        after_vowel = last in _G2P_VOWELS
+        if after_vowel:
+            out.append(_ACUTE)
+            last = _ACUTE
+        if (len(run) > 1 or not after_vowel) and nxt[:1] in _G2P_VOWELS:
+            nxt = nxt[0] + _ACUTE + nxt[1:]
+        out.append(nxt)
+        last = nxt[-1:] or last
+    return ''.join(out)
+
+
+class _ServiceAccenter:
+    """Accents through the shared accent service; loads ruaccent in-process while the service is down.
+
+    After a failure the local accenter serves requests for `retry_sec`, then the service is
+    tried again, so a restarted service is picked up without restarting this process.
+    """
+
+    def __init__(self, socket_path: str, fallback: bool = True, retry_sec: float = 30.0):
+        from app.services.text.accent_service import AccentClient
+
+        self.client = AccentClient(socket_path)
+        self.fallback = fallback
+        self.retry_sec = retry_sec
+        self._local = None
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str) -> str:
+        if time.monotonic() >= self._retry_at:
+            try:
+                return self.client(text)
+            except OSError:
+                if not self.fallback:
+                    raise
+                with self._lock:
+                    if time.monotonic() >= self._retry_at:
+                        logger.warning('Accent service %s unavailable, accenting in-process for %.0fs', self.client.socket_path, self.retry_sec)
+                        self._retry_at = time.monotonic() + self.retry_sec
+                    if self._local is None:
+                        self._local = RussianTextFrontend._build_accenter() or (lambda t: t)
+        return self._local(text)
 
 
 class RussianTextFrontend:
-    _G2P_CHAR_TO_TOKEN = {
-        'а': 'A', 'б': 'B', 'в': 'V', 'г': 'G', 'д': 'D', 'е': 'E', 'ё': 'YO', 'ж': 'ZH', 'з': 'Z',
-        'и': 'I', 'й': 'J', 'к': 'K', 'л': 'L', 'м': 'M', 'н': 'N', 'о': 'O', 'п': 'P', 'р': 'R',
-        'с': 'S', 'т': 'T', 'у': 'U', 'ф': 'F', 'х': 'H', 'ц': 'TS', 'ч': 'CH', 'ш': 'SH',
-        'щ': 'SCH', 'ъ': 'HARD', 'ы': 'Y', 'ь': 'SOFT', 'э': 'EH', 'ю': 'YU', 'я': 'YA',
-    }
+    _G2P_CHAR_TO_TOKEN = _G2P_CHAR_TO_TOKEN
     _G2P_TOKEN_TO_CHAR = {v: k for k, v in _G2P_CHAR_TO_TOKEN.items()}
 
-    def __init__(self, overrides_path: str):
+    def __init__(self, overrides_path: str, accent_service: str | None = None, accent_fallback: bool = True, accent_retry_sec: float = 30.0):
         self.morph = None
-        self._accent_callable = self._build_accenter()
+        # With a shared accent service the ruaccent models stay out of this process.
+        self._accent_callable = _ServiceAccenter(accent_service, accent_fallback, accent_retry_sec) if accent_service else self._build_accenter()
         self.overrides_path = overrides_path
         self.overrides = self._load_overrides()
 
@@ -82,6 +169,98 @@ class RussianTextFrontend:
         lines = text.splitlines()
         return [line if line.strip() else '__STANZA_BREAK__' for line in lines]
 
+    @staticmethod
+    def _pack(pieces: list[str], max_chars: int) -> list[str]:
+        out: list[str] = []
+        current = ''
+        for piece in pieces:
+            if current and len(current) + 1 + len(piece) > max_chars:
+                out.append(current)
+                current = piece
+            else:
+                current = f'{current} {piece}' if current else piece
+        if current:
+            out.append(current)
+        return out
+
+    @classmethod
+    def _split_long(cls, text: str, max_chars: int) -> list[str]:
+        if len(text) <= max_chars:
+            return [text]
+        pieces: list[str] = []
+        # Prefer clause boundaries (after , ; : or before a spaced dash), then fall back to words.
+        for clause in re.split(r'(?<=[,;:])\s+|\s+(?=[—–-]\s)', text):
+            if len(clause) > max_chars:
+                pieces.extend(cls._pack(clause.split(), max_chars))
+            else:
+                pieces.append(clause)
+        return cls._pack(pieces, max_chars)
+
+    @staticmethod
+    def _match_anchor(pieces: list[str], start: int, anchors: frozenset[str], max_chars: int) -> int:
+        """End index of the longest run of pieces from `start` that joins into an anchor chunk, else 0."""
+        end = 0
+        text = ''
+        for j in range(start, len(pieces)):
+            if pieces[j] == '__STANZA_BREAK__':
+                break
+            text = f'{text} {pieces[j]}' if text else pieces[j]
+            if len(text) > max_chars:
+                break
+            if text in anchors:
+                end = j + 1
+        return end
+
+    @classmethod
+    def plan_chunks(
+        cls,
+        parts: list[str],
+        min_chars: int = 80,
+        max_chars: int = 180,
+        merge: bool = True,
+        anchors: frozenset[str] = frozenset(),
+    ) -> list[str]:
+        """Reshape split_story/split_poem output into chunks near the XTTS sweet spot.
+
+        Long parts are split at clause boundaries so none exceeds `max_chars`; with `merge`
+        consecutive short parts are joined while shorter than `min_chars`. `__STANZA_BREAK__`
+        markers are kept in place and never merged across, so concat pauses stay the same.
+        `anchors` are chunk texts of a previous render: wherever the pieces reproduce one it is
+        emitted unchanged, so an edit only reshapes the chunks around it.
+        """
+        pieces: list[str] = []
+        for part in parts:
+            pieces.extend([part] if part == '__STANZA_BREAK__' else cls._split_long(part, max_chars))
+        planned: list[str] = []
+        current = ''
+        i = 0
+        while i < len(pieces):
+            piece = pieces[i]
+            end = cls._match_anchor(pieces, i, anchors, max_chars) if anchors and piece != '__STANZA_BREAK__' else 0
+            if piece == '__STANZA_BREAK__' or end:
+                if current:
+                    planned.append(current)
+                    current = ''
+                if end:
+                    planned.append(' '.join(pieces[i:end]))
+                    i = end
+                else:
+                    planned.append(piece)
+                    i += 1
+                continue
+            if not merge:
+                planned.append(piece)
+            elif current and len(current) < min_chars and len(current) + 1 + len(piece) <= max_chars:
+                current = f'{current} {piece}'
+            else:
+                if current:
+                    planned.append(current)
+                current = piece
+            i += 1
+        if current:
+            planned.append(current)
+        return planned
+
     def apply_accents(self, text: str, use_user_overrides: bool = True, enable_auto: bool = True) -> str:
         # Keep user/manual accents with highest priority and only accentize the rest.
         word_re = r'[А-Яа-яЁё\u0301-]+'
@@ -157,53 +336,22 @@ class RussianTextFrontend:
 
     def text_to_phonemes(self, text: str) -> str:
         """Experimental G2P view for user-editable phoneme input."""
-        text = re.sub(r'\s+', ' ', text).strip()
-        out = []
-        for ch in text:
-            if ch == ' ':
-                out.append('|')
-                continue
-            if ch == '́':
-                out.append('+')
-                continue
-            low = ch.lower()
-            token = self._G2P_CHAR_TO_TOKEN.get(low)
-            if token is None:
-                out.append(ch)
-            else:
-                out.append(token if ch.islower() else token)
-        return ' '.join(out)
+        # Word gaps become '|' up front; then one table lookup per char in C (map + dict.get),
+        # unknown chars pass through unchanged.
+        text = '|'.join(text.split())
+        return ' '.join(map(_G2P_ENCODE.get, text, text))
 
     def phonemes_to_text(self, phoneme_text: str) -> str:
         """Inverse transform for editable phoneme stream back to Russian text."""
-        tokens = phoneme_text.split()
-        chars: list[str] = []
-        vowels = set('аеёиоуыэюя')
-        stress_next = False
-        for token in tokens:
-            if token == '|':
-                chars.append(' ')
-                stress_next = False
-                continue
-            if token == '+':
-                # accept both notations: + before or after stressed vowel token
-                if chars and chars[-1] in vowels:
-                    chars.append('́')
-                    stress_next = False
-                else:
-                    stress_next = True
-                continue
-            ch = self._G2P_TOKEN_TO_CHAR.get(token.upper())
-            if ch is None:
-                chars.append(token)
-                stress_next = False
-                continue
-            chars.append(ch)
-            if stress_next and ch in vowels:
-                chars.append('́')
-            stress_next = False
-
-        text = ''.join(chars)
-        text = re.sub(r'\s+([,.;:!?])', r'\1', text)
-        text = re.sub(r'([,.;:!?])(\S)', r'\1 \2', text)
-        return text
+        get = _G2P_DECODE.get
+        # Unknown tokens are fenced with marker chars so stress resolution never treats them as a
+        # known vowel; a bare vowel token may still take a following '+', like in the token walk.
+        text = ''.join([
+            get(t) or get(t.upper()) or (_G2P_OPEN + t if t in _G2P_VOWELS else _G2P_OPEN + t + _G2P_CLOSE)
+            for t in _strip_markers(phoneme_text).split()
+        ])
+        if _G2P_STRESS in text:
+            text = _resolve_stress(text)
+        text = _strip_markers(text)
+        text = _PUNCT_SPACE_RE.sub('', text)
+        return _PUNCT_GAP_RE.sub(r'\1 \2', text)
@@ -0,0 +1,65 @@
+import gzip
+import hashlib
+import os
+from pathlib import Path
+
+from app.core.config import get_settings
+
+# Job text fields that can be book-length; anything else in input_params stays inline.
+TEXT_FIELDS = ('text', 'phoneme_text', 'decoded_phoneme_text', 'prepared_text', 'backend_text')
+REF_SUFFIX = '_ref'
+
+
+class TextStore:
+    """Gzip-compressed texts stored once under their sha256, so identical manuscripts share one file."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / f'{digest}.txt.gz'
+
+    def put(self, text: str) -> str:
+        data = text.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f'{digest}.{os.getpid()}.tmp')
+            tmp.write_bytes(gzip.compress(data, compresslevel=6))
+            os.replace(tmp, path)
+        return f'sha256:{digest}'
+
+    def get(self, ref: str) -> str:
+        digest = ref.split(':', 1)[1]
+        return gzip.decompress(self._path(digest).read_bytes()).decode('utf-8')
+
+
+def get_text_store() -> TextStore:
+    return TextStore(get_settings().texts_dir)
+
+
+def slim_params(params: dict) -> dict:
+    """Replace large text fields with `<field>_ref` pointers into the text store."""
+    threshold = get_settings().text_offload_min_chars
+    slim = dict(params)
+    store = None
+    for field in TEXT_FIELDS:
+        value = slim.get(field)
+        if isinstance(value, str) and len(value) >= threshold:
+            store = store or get_text_store()
+            slim[f'{field}{REF_SUFFIX}'] = store.put(value)
+            del slim[field]
+    return slim
+
+
+def expand_params(params: dict) -> dict:
+    """Inverse of slim_params: load referenced texts back inline."""
+    full = dict(params)
+    store = None
+    for field in TEXT_FIELDS:
+        ref = full.pop(f'{field}{REF_SUFFIX}', None)
+        if ref:
+            store = store or get_text_store()
+            full[field] = store.get(ref)
+    return full
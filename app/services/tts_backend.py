@@ -1,12 +1,23 @@
 import hashlib
 import json
+import threading
 import warnings
+from collections import OrderedDict
 from pathlib import Path
 
+import numpy as np
 import torch
-from pydub import AudioSegment
+import torch.nn.functional as F
 
+from app.services.audio.processing import REFERENCE_SAMPLE_RATE, ffmpeg_transcode, reference_array_path, write_wav
 
+STOCK_MODEL_NAME = 'tts_models/multilingual/multi-dataset/xtts_v2'
+FAST_CHECKPOINT_DIRNAME = 'xtts_v2_fast'
+FAST_CHECKPOINT_FILES = ('model.safetensors', 'config.json', 'vocab.json')
+# Coqui's Synthesizer pads every rendered sentence with this many zero samples; keep the
+# same tail so chunk rhythm (and the concat pauses tuned on top of it) does not change.
+_TRAILING_SILENCE_SAMPLES = 10000
+_CONDITIONING_CACHE_SIZE = 8
 
 
 def _ensure_torch_load_compat() -> None:
@@ -54,12 +65,85 @@ def _suppress_known_torchaudio_deprecation_warnings() -> None:
     )
 
 
+def stock_checkpoint_dir() -> Path:
+    """Directory of the stock Coqui XTTS-v2 download (model.pth, config.json, vocab.json), fetched on first use."""
+    from TTS.utils.manage import ModelManager
+
+    model_path, _, _ = ModelManager(progress_bar=False).download_model(STOCK_MODEL_NAME)
+    path = Path(model_path)
+    return path if path.is_dir() else path.parent
+
+
+def load_fast_checkpoint(checkpoint_dir: Path):
+    """Build Xtts from a convert_xtts_fast.py artifact without pickle or a weights copy.
+
+    safetensors maps the file and the tensors it returns are views of that mapping;
+    load_state_dict(assign=True) keeps them as the parameters, so pages are read lazily
+    on first use and shared through the page cache between worker processes.
+    """
+    from safetensors.torch import load_file
+    from TTS.tts.configs.xtts_config import XttsConfig
+    from TTS.tts.layers.xtts.tokenizer import VoiceBpeTokenizer
+    from TTS.tts.models.xtts import Xtts
+
+    config = XttsConfig()
+    config.load_json(str(checkpoint_dir / 'config.json'))
+    model = Xtts.init_from_config(config)
+    model.tokenizer = VoiceBpeTokenizer(vocab_file=str(checkpoint_dir / 'vocab.json'))
+    model.init_models()
+    model.load_state_dict(load_file(str(checkpoint_dir / 'model.safetensors'), device='cpu'), strict=True, assign=True)
+    model.hifigan_decoder.eval()
+    model.gpt.init_gpt_for_inference(kv_cache=model.args.kv_cache, use_deepspeed=False)
+    model.gpt.eval()
+    return model, config
+
+
+def load_checkpoint_dir(checkpoint_dir: Path):
+    """Load a fine-tuned XTTS checkpoint directory: a convert_xtts_fast.py artifact or Coqui trainer output.
+
+    Trainer outputs rarely carry vocab.json; the stock model's vocabulary is used then.
+    """
+    if all((checkpoint_dir / name).is_file() for name in FAST_CHECKPOINT_FILES):
+        return load_fast_checkpoint(checkpoint_dir)
+    from TTS.tts.configs.xtts_config import XttsConfig
+    from TTS.tts.models.xtts import Xtts
+
+    weights = next((p for p in (checkpoint_dir / 'model.pth', checkpoint_dir / 'best_model.pth') if p.is_file()), None)
+    if weights is None:
+        candidates = sorted(checkpoint_dir.glob('*.pth'), key=lambda p: p.stat().st_mtime)
+        if not candidates:
+            raise FileNotFoundError(f'No XTTS weights in {checkpoint_dir}')
+        weights = candidates[-1]
+    vocab = checkpoint_dir / 'vocab.json'
+    if not vocab.is_file():
+        vocab = stock_checkpoint_dir() / 'vocab.json'
+    config = XttsConfig()
+    config.load_json(str(checkpoint_dir / 'config.json'))
+    model = Xtts.init_from_config(config)
+    model.load_checkpoint(config, checkpoint_dir=str(checkpoint_dir), checkpoint_path=str(weights), vocab_path=str(vocab), eval=True, use_deepspeed=False)
+    return model, config
+
+
 class XTTSBackend:
-    def __init__(self, models_dir: str):
+    def __init__(self, models_dir: str, prefer_fast_checkpoint: bool = True, checkpoint_dir: str | None = None):
         self.models_dir = Path(models_dir)
         self.models_dir.mkdir(parents=True, exist_ok=True)
+        self.prefer_fast_checkpoint = prefer_fast_checkpoint
+        # Fine-tuned checkpoint directory; None means the stock XTTS-v2 model.
+        self.checkpoint_dir = checkpoint_dir
         self.device = 'cpu'
         self.model = None
+        self.config = None
+        self._conditioning: OrderedDict[str, tuple] = OrderedDict()
+        # Render threads and the micro-batch thread share the cache; latents are computed outside it.
+        self._conditioning_lock = threading.Lock()
+
+    @property
+    def fast_checkpoint_dir(self) -> Path:
+        return self.models_dir / FAST_CHECKPOINT_DIRNAME
+
+    def _has_fast_checkpoint(self) -> bool:
+        return all((self.fast_checkpoint_dir / name).is_file() for name in FAST_CHECKPOINT_FILES)
 
     def _load(self):
         if self.model is not None:
@@ -67,12 +151,33 @@ class XTTSBackend:
         _suppress_known_torchaudio_deprecation_warnings()
         _ensure_torch_load_compat()
         _ensure_transformers_compat()
-        from TTS.api import TTS
 
         torch.set_num_threads(4)
-        self.model = TTS(model_name='tts_models/multilingual/multi-dataset/xtts_v2', progress_bar=False).to(self.device)
+        if self.checkpoint_dir:
+            model, config = load_checkpoint_dir(Path(self.checkpoint_dir))
+        elif self.prefer_fast_checkpoint and self._has_fast_checkpoint():
+            model, config = load_fast_checkpoint(self.fast_checkpoint_dir)
+        else:
+            from TTS.api import TTS
+
+            api = TTS(model_name=STOCK_MODEL_NAME, progress_bar=False)
+            model, config = api.synthesizer.tts_model, api.synthesizer.tts_config
+        model.to(self.device)
+        # Inference only: frozen parameters never get grad buffers or version bumps, so weights
+        # loaded in a prefork parent stay shared copy-on-write with the children.
+        model.eval()
+        model.requires_grad_(False)
+        self.model = model
+        self.config = config
         return self.model
 
+    def memory_bytes(self) -> int:
+        """Bytes held by the loaded model's parameters and buffers (0 when not loaded)."""
+        if self.model is None:
+            return 0
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
     @staticmethod
     def _hash_paths(paths: list[str]) -> str:
         key = '|'.join(sorted(paths))
@@ -94,13 +199,167 @@ class XTTSBackend:
         cache['cache_path'] = str(p)
         return cache
 
-    def tts_to_file(self, text: str, output_wav: str, speed: float, speaker_wavs: list[str], language: str = 'ru') -> None:
+    def get_conditioning(self, speaker_wavs: list[str]) -> tuple:
+        """GPT conditioning latents and speaker embedding for a reference set, computed once per set."""
+        key = self._hash_paths(speaker_wavs)
+        with self._conditioning_lock:
+            cached = self._conditioning.get(key)
+            if cached is not None:
+                self._conditioning.move_to_end(key)
+                return cached
         model = self._load()
-        model.tts_to_file(text=text, file_path=output_wav, speaker_wav=speaker_wavs, language=language, speed=speed)
+        cfg = self.config
+        arrays = [reference_array_path(x) for x in speaker_wavs]
+        with torch.inference_mode():
+            if all(Path(x).is_file() for x in arrays):
+                cond = self._conditioning_from_arrays(arrays)
+            else:
+                cond = model.get_conditioning_latents(
+                    audio_path=list(speaker_wavs),
+                    gpt_cond_len=cfg.gpt_cond_len,
+                    gpt_cond_chunk_len=cfg.gpt_cond_chunk_len,
+                    max_ref_length=cfg.max_ref_len,
+                    sound_norm_refs=cfg.sound_norm_refs,
+                )
+        with self._conditioning_lock:
+            self._conditioning[key] = cond
+            while len(self._conditioning) > _CONDITIONING_CACHE_SIZE:
+                self._conditioning.popitem(last=False)
+        return cond
+
+    def _conditioning_from_arrays(self, array_paths: list[str]) -> tuple:
+        """Same steps as Xtts.get_conditioning_latents, fed from pre-resampled .npy references.
+
+        The arrays are already mono float32 at the model's load rate, so nothing is decoded or
+        resampled to 22.05 kHz here; only the max_ref_len head of each memory map is read.
+        """
+        model, cfg = self.model, self.config
+        limit = REFERENCE_SAMPLE_RATE * cfg.max_ref_len
+        audios, embeddings = [], []
+        for path in array_paths:
+            head = np.array(np.load(path, mmap_mode='r')[:limit], dtype=np.float32)
+            audio = torch.from_numpy(head).unsqueeze(0).clamp_(-1, 1)
+            if cfg.sound_norm_refs:
+                audio = (audio / torch.abs(audio).max()) * 0.75
+            embeddings.append(model.get_speaker_embedding(audio, REFERENCE_SAMPLE_RATE))
+            audios.append(audio)
+        gpt_cond_latent = model.get_gpt_cond_latents(
+            torch.cat(audios, dim=-1), REFERENCE_SAMPLE_RATE, length=cfg.gpt_cond_len, chunk_length=cfg.gpt_cond_chunk_len,
+        )
+        speaker_embedding = torch.stack(embeddings).mean(dim=0)
+        return gpt_cond_latent, speaker_embedding
+
+    def _sampling_kwargs(self) -> dict:
+        cfg = self.config
+        return {
+            'temperature': cfg.temperature,
+            'length_penalty': cfg.length_penalty,
+            'repetition_penalty': cfg.repetition_penalty,
+            'top_k': cfg.top_k,
+            'top_p': cfg.top_p,
+        }
+
+    @property
+    def sample_rate(self) -> int:
+        self._load()
+        return self.config.audio.output_sample_rate
+
+    def synthesize(self, text: str, conditioning: tuple, speed: float, language: str = 'ru') -> np.ndarray:
+        model = self._load()
+        gpt_cond_latent, speaker_embedding = conditioning
+        with torch.inference_mode():
+            out = model.inference(
+                text, language, gpt_cond_latent, speaker_embedding,
+                speed=speed, enable_text_splitting=True, **self._sampling_kwargs(),
+            )
+        return np.asarray(out['wav'], dtype=np.float32)
+
+    def synthesize_batch(self, texts: list[str], conditioning: tuple, speed: float, language: str = 'ru') -> list[np.ndarray]:
+        """Render several short texts sharing one conditioning with a single batched GPT decode.
+
+        Prefixes (conditioning + text embeddings) are left-padded and masked, so every row sees
+        the same relative mel positions as an unbatched call; decoding codes to latents and
+        audio then runs per item exactly like Xtts.inference. Texts over the model's character
+        limit go through the regular (sentence-splitting) path instead.
+        """
+        model = self._load()
+        gpt = model.gpt
+        char_limit = model.tokenizer.char_limits.get(language, 250)
+        gpt_cond_latent, speaker_embedding = conditioning
+        results: list[np.ndarray | None] = [None] * len(texts)
+        batch_idx: list[int] = []
+        tokens: list[torch.Tensor] = []
+        for i, text in enumerate(texts):
+            if len(text) > char_limit:
+                results[i] = self.synthesize(text, conditioning, speed, language)
+                continue
+            tokens.append(torch.IntTensor(model.tokenizer.encode(text.strip().lower(), lang=language)).unsqueeze(0).to(self.device))
+            batch_idx.append(i)
+        if not tokens:
+            return results
+
+        with torch.inference_mode():
+            prefixes = []
+            for tok in tokens:
+                t = F.pad(tok, (0, 1), value=gpt.stop_text_token)
+                t = F.pad(t, (1, 0), value=gpt.start_text_token)
+                emb = gpt.text_embedding(t) + gpt.text_pos_embedding(t)
+                prefixes.append(torch.cat([gpt_cond_latent, emb], dim=1))
+            max_len = max(p.shape[1] for p in prefixes)
+            prefix_emb = prefixes[0].new_zeros((len(prefixes), max_len, prefixes[0].shape[-1]))
+            attention_mask = torch.zeros((len(prefixes), max_len + 1), dtype=torch.long, device=self.device)
+            for row, p in enumerate(prefixes):
+                prefix_emb[row, max_len - p.shape[1]:] = p[0]
+                attention_mask[row, max_len - p.shape[1]:] = 1
+            gpt.gpt_inference.store_prefix_emb(prefix_emb)
+            gpt_inputs = torch.full((len(prefixes), max_len + 1), fill_value=1, dtype=torch.long, device=self.device)
+            gpt_inputs[:, -1] = gpt.start_audio_token
+            generated = gpt.gpt_inference.generate(
+                gpt_inputs,
+                attention_mask=attention_mask,
+                bos_token_id=gpt.start_audio_token,
+                pad_token_id=gpt.stop_audio_token,
+                eos_token_id=gpt.stop_audio_token,
+                max_length=gpt.max_gen_mel_tokens + gpt_inputs.shape[-1],
+                do_sample=True,
+                num_return_sequences=1,
+                num_beams=1,
+                output_attentions=False,
+                **self._sampling_kwargs(),
+            )[:, gpt_inputs.shape[1]:]
+
+            length_scale = 1.0 / max(speed, 0.05)
+            for row, i in enumerate(batch_idx):
+                codes = generated[row]
+                stops = (codes == gpt.stop_audio_token).nonzero()
+                codes = codes[: int(stops[0]) + 1 if len(stops) else codes.shape[0]].unsqueeze(0)
+                tok = tokens[row]
+                latents = gpt(
+                    tok,
+                    torch.tensor([tok.shape[-1]], device=self.device),
+                    codes,
+                    torch.tensor([codes.shape[-1] * gpt.code_stride_len], device=self.device),
+                    cond_latents=gpt_cond_latent,
+                    return_attentions=False,
+                    return_latent=True,
+                )
+                if length_scale != 1.0:
+                    latents = F.interpolate(latents.transpose(1, 2), scale_factor=length_scale, mode='linear').transpose(1, 2)
+                results[i] = model.hifigan_decoder(latents, g=speaker_embedding).cpu().squeeze().numpy().astype(np.float32)
+        return results
+
+    def write_output(self, wav: np.ndarray, output_wav: str) -> None:
+        wav = np.concatenate([wav, np.zeros(_TRAILING_SILENCE_SAMPLES, dtype=np.float32)])
+        write_wav(output_wav, wav, self.sample_rate)
+
+    def tts_to_file(self, text: str, output_wav: str, speed: float, speaker_wavs: list[str], language: str = 'ru') -> None:
+        wav = self.synthesize(text, self.get_conditioning(speaker_wavs), speed, language)
+        self.write_output(wav, output_wav)
 
     @staticmethod
-    def transcode_if_needed(path_wav: str, final_path: str) -> str:
-        if final_path.endswith('.wav'):
+    def transcode_if_needed(path_wav: str, final_path: str, sample_rate: int | None = None, bitrate_kbps: int | None = None) -> str:
+        fmt = Path(final_path).suffix.lstrip('.')
+        if fmt == 'wav' and not sample_rate:
             return path_wav
-        AudioSegment.from_wav(path_wav).export(final_path, format='mp3', bitrate='192k')
+        ffmpeg_transcode(path_wav, final_path, fmt, sample_rate=sample_rate, bitrate_kbps=bitrate_kbps)
         return final_path
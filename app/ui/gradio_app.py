@@ -82,7 +82,7 @@ with gr.Blocks(title='Voice AI') as demo:
 
     with gr.Tab('Preview/Train'):
         voice_id = gr.Textbox(label='Voice ID')
-        preview_text = gr.Textbox(value='Привет! Это быстрый тест.', label='Preview text')
+        preview_text = gr.Textbox(value='Привет! Это тест вашего голоса.', label='Preview text')
         out_preview = gr.JSON(label='Preview job')
         gr.Button('Run preview').click(run_preview, [voice_id, preview_text], out_preview)
 
@@ -97,7 +97,7 @@ with gr.Blocks(title='Voice AI') as demo:
         t_profile = gr.Textbox(label='Profile ID (optional)')
         t_text = gr.Textbox(lines=8, label='Text')
         t_mode = gr.Dropdown(['story', 'poem'], value='story', label='Mode')
-        t_fmt = gr.Dropdown(['wav', 'mp3'], value='wav', label='Format')
+        t_fmt = gr.Dropdown(['wav', 'mp3', 'opus'], value='wav', label='Format')
         t_speed = gr.Slider(0.5, 1.5, value=1.0, step=0.05, label='Speed')
         t_acc = gr.Checkbox(value=True, label='Use accenting')
         t_ovr = gr.Checkbox(value=True, label='Use user overrides')
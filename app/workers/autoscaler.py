@@ -0,0 +1,160 @@
+"""Resize preview/render worker pools from queue depth and CPU load.
+
+Run as a daemon next to the workers (systemd/voice-autoscaler.service):
+  python -m app.workers.autoscaler
+
+Every AUTOSCALE_INTERVAL_SEC it reads the broker queue lengths, the workers' pool sizes
+and active tasks (Celery remote control) and the host load average. A pool's depth includes
+the worker-direct queues of its nodes, where model-affinity routing sends fine-tuned
+renders; that backlog can only be served by its own node, so growing for it targets that node. A pool grows by one
+process after AUTOSCALE_UP_TICKS consecutive samples with a backlog, as long as the host
+is not saturated; it shrinks by one after AUTOSCALE_DOWN_TICKS samples with an empty queue
+and an idle process. After any change the pool is left alone for AUTOSCALE_COOLDOWN_SEC,
+so a burst does not make it oscillate. Preview and render workers share the CPU, so an
+idle preview pool shrinking is what lets a backlogged render pool grow under the load cap.
+"""
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+import redis
+from celery.utils import worker_direct
+
+from app.core.config import get_settings
+from app.db.redis_client import get_redis
+from app.services import metrics
+from app.workers.celery_app import celery_app
+
+logger = logging.getLogger('voiceai.autoscaler')
+# kombu's Redis transport keeps messages of non-zero priority in '<queue>\x06\x16<n>' lists.
+_PRIORITY_SEP = '\x06\x16'
+_PRIORITY_STEPS = (0, 3, 6, 9)
+
+
+def queue_depth(r: redis.Redis, queue: str) -> int:
+    """Messages waiting in a Celery queue, across kombu's priority sub-queues."""
+    pipe = r.pipeline()
+    for step in _PRIORITY_STEPS:
+        pipe.llen(queue if step == 0 else f'{queue}{_PRIORITY_SEP}{step}')
+    return sum(pipe.execute())
+
+
+def host_load() -> float:
+    """1-minute load average per CPU."""
+    return os.getloadavg()[0] / (os.cpu_count() or 1)
+
+
+@dataclass
+class PoolScaler:
+    queue: str
+    min_procs: int
+    max_procs: int
+    up_streak: int = 0
+    down_streak: int = 0
+    last_change: float = 0.0
+
+    def decide(self, depth: int, procs: int, busy: int, load: float, now: float, saturated: bool | None = None) -> int:
+        """+1 / -1 / 0 processes for this pool; `saturated` overrides `busy >= procs` (direct-queue backlog)."""
+        s = get_settings()
+        if saturated is None:
+            saturated = busy >= procs
+        self.up_streak = self.up_streak + 1 if depth > 0 and saturated else 0
+        self.down_streak = self.down_streak + 1 if depth == 0 and busy < procs else 0
+        if procs < self.min_procs:
+            return 1
+        if procs > self.max_procs:
+            return -1
+        if now - self.last_change < s.autoscale_cooldown_sec:
+            return 0
+        if self.up_streak >= s.autoscale_up_ticks and procs < self.max_procs and load < s.autoscale_max_load:
+            return 1
+        if self.down_streak >= s.autoscale_down_ticks and procs > self.min_procs:
+            return -1
+        return 0
+
+
+def _pool_state(queues: set[str]) -> dict[str, dict[str, dict]]:
+    """queue -> node -> {'procs', 'busy'} for every worker consuming one of `queues`."""
+    inspect = celery_app.control.inspect(timeout=2.0)
+    active_queues = inspect.active_queues() or {}
+    stats = inspect.stats() or {}
+    active = inspect.active() or {}
+    state: dict[str, dict[str, dict]] = {q: {} for q in queues}
+    for node, consumed in active_queues.items():
+        pool = (stats.get(node) or {}).get('pool') or {}
+        procs = len(pool.get('processes') or []) or int(pool.get('max-concurrency') or 0)
+        for q in {c['name'] for c in consumed} & queues:
+            state[q][node] = {'procs': procs, 'busy': len(active.get(node) or [])}
+    return state
+
+
+def _apply(queue: str, nodes: dict[str, dict], delta: int) -> str | None:
+    if delta > 0:
+        # A node whose direct queue waits on busy processes can only be helped by growing that node.
+        stuck = [n for n, x in nodes.items() if x['direct'] > 0 and x['busy'] >= x['procs']]
+        node = max(stuck, key=lambda n: nodes[n]['direct']) if stuck else min(nodes, key=lambda n: nodes[n]['procs'])
+        celery_app.control.pool_grow(1, destination=[node])
+    else:
+        node = max(nodes, key=lambda n: nodes[n]['procs'] - nodes[n]['busy'])
+        celery_app.control.pool_shrink(1, destination=[node])
+    return node
+
+
+def tick(scalers: dict[str, PoolScaler]) -> None:
+    now = time.monotonic()
+    load = host_load()
+    state = _pool_state(set(scalers))
+    r = get_redis()
+    metrics.set_gauge('voiceai_autoscaler_load', round(load, 3))
+    for queue, scaler in scalers.items():
+        nodes = state.get(queue) or {}
+        try:
+            shared = queue_depth(r, queue)
+            for node, n in nodes.items():
+                n['direct'] = queue_depth(r, worker_direct(node).name)
+        except redis.RedisError:
+            logger.warning('Cannot read depth of %s, skipping', queue)
+            continue
+        direct = sum(n['direct'] for n in nodes.values())
+        depth = shared + direct
+        procs = sum(n['procs'] for n in nodes.values())
+        busy = sum(n['busy'] for n in nodes.values())
+        # The shared queue is served by any node; a direct queue only by its own.
+        saturated = (shared > 0 and busy >= procs) or any(n['direct'] > 0 and n['busy'] >= n['procs'] for n in nodes.values())
+        metrics.set_gauge('voiceai_autoscaler_direct_depth', direct, queue=queue)
+        metrics.set_gauge('voiceai_autoscaler_queue_depth', depth, queue=queue)
+        metrics.set_gauge('voiceai_autoscaler_concurrency', procs, queue=queue)
+        if not nodes:
+            continue
+        delta = scaler.decide(depth, procs, busy, load, now, saturated)
+        if delta == 0:
+            continue
+        node = _apply(queue, nodes, delta)
+        scaler.last_change = now
+        scaler.up_streak = scaler.down_streak = 0
+        action = 'grow' if delta > 0 else 'shrink'
+        metrics.incr('voiceai_autoscaler_decisions_total', queue=queue, action=action)
+        logger.info('%s %s on %s: depth=%d (direct %d) procs=%d busy=%d load=%.2f', action, queue, node, depth, direct, procs, busy, load)
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    s = get_settings()
+    scalers = {
+        s.celery_preview_queue: PoolScaler(s.celery_preview_queue, s.autoscale_preview_min, s.autoscale_preview_max),
+        s.celery_render_queue: PoolScaler(s.celery_render_queue, s.autoscale_render_min, s.autoscale_render_max),
+    }
+    logger.info('Autoscaling %s every %ss', ', '.join(f'{q} [{x.min_procs}..{x.max_procs}]' for q, x in scalers.items()), s.autoscale_interval_sec)
+    while True:
+        try:
+            tick(scalers)
+        except Exception:
+            # A broker hiccup or a worker restarting must not kill the daemon.
+            logger.exception('Autoscaler tick failed')
+        time.sleep(s.autoscale_interval_sec)
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -7,10 +7,20 @@ settings = get_settings()
 celery_app = Celery('voiceai', broker=settings.redis_url, backend=settings.redis_url)
 celery_app.conf.task_routes = {
     'app.workers.tasks.run_preview': {'queue': settings.celery_preview_queue},
+    'app.workers.tasks.check_speculative_preview': {'queue': settings.celery_preview_queue},
+    'app.workers.tasks.run_speculative_preview': {'queue': settings.celery_preview_queue},
     'app.workers.tasks.run_train': {'queue': settings.celery_train_queue},
     'app.workers.tasks.run_tts': {'queue': settings.celery_render_queue},
+    'app.workers.tasks.run_tts_batch': {'queue': settings.celery_render_queue},
 }
 celery_app.conf.task_track_started = True
+# Every worker also consumes its own <node>.dq queue, so the API can send a fine-tuned
+# render to the worker that already holds that checkpoint (see model_registry).
+celery_app.conf.worker_direct = True
+# Late acks keep a long render in the broker until it finishes; fetch one message at a time
+# and give the Redis visibility timeout enough headroom not to redeliver a render still running.
+celery_app.conf.worker_prefetch_multiplier = 1
+celery_app.conf.broker_transport_options = {'visibility_timeout': settings.celery_visibility_timeout}
 
 # Ensure workers register task modules explicitly
 celery_app.conf.imports = ('app.workers.tasks',)
@@ -0,0 +1,22 @@
+"""Enqueue tasks by name without importing Celery until the first send.
+
+The API only ever needs `send_task`; keeping Celery/kombu out of its import path
+shortens cold starts.
+"""
+
+from app.core import tracing
+
+
+def send_task(name: str, args: list, worker: str | None = None, **options):
+    """`worker` (a Celery node name) sends the task to that node's direct queue instead of the routed one."""
+    from app.workers.celery_app import celery_app
+
+    if worker:
+        from celery.utils import worker_direct
+
+        options['queue'] = worker_direct(worker)
+    # The worker continues the caller's trace from these message headers.
+    headers = tracing.inject()
+    if headers:
+        options['headers'] = {**options.get('headers', {}), **headers}
+    return celery_app.send_task(name, args=args, **options)
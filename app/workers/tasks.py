@@ -1,41 +1,168 @@
+import gc
 import os
+import socket
+import threading
+import time
+import zipfile
+from concurrent.futures import Future
 from pathlib import Path
 
+from celery.signals import task_postrun, task_prerun, worker_init, worker_process_init, worker_process_shutdown
+from celery.utils.log import get_task_logger
 from sqlalchemy import select
 
+from app.core import tracing
 from app.core.config import get_settings
 from app.db.session import SessionLocal
-from app.models import Artifact, JobStatus, TTSJob, TrainJob, VoiceProfile, VoiceSample
-from app.services.audio.processing import concat_with_pauses, save_json
+from app.models import Artifact, JobStatus, JobType, TTSJob, TrainJob, VoiceProfile, VoiceSample
+from app.services.audio.hls import HLSPlaylist
+from app.services.audio.processing import concat_with_pauses, save_json, wav_duration
+from app.services import admission, metrics, model_registry, speculative_preview
+from app.services.microbatch import MicroBatcher
+from app.services.model_pool import ModelPool
+from app.services.checkpoint import ChunkManifest, chunk_key, render_params_hash
+from app.services.preview_cache import PreviewCache, enqueue_default_preview
+from app.services.render_pipeline import RenderPipeline
+from app.services.repository import profile_refs
+from app.services.synthesis import decode_input, prepare_text, render_preview, split_blocks
+from app.services.text_store import slim_params
 from app.services.text.frontend import RussianTextFrontend
 from app.services.tts_backend import XTTSBackend
 from app.workers.celery_app import celery_app
 
 settings = get_settings()
+logger = get_task_logger(__name__)
 _frontend = None
-_tts = None
+_pool = None
+_batcher = None
+# With `-P threads` several tasks can hit the lazy getters at once.
+_init_lock = threading.Lock()
+# Celery node name (e.g. render@host); model holders are registered under it for affinity routing.
+_node = None
 
 
 def _get_frontend():
     global _frontend
-    if _frontend is None:
-        _frontend = RussianTextFrontend(settings.accent_overrides_path)
+    with _init_lock:
+        if _frontend is None:
+            _frontend = RussianTextFrontend(
+                settings.accent_overrides_path,
+                accent_service=settings.accent_service_socket or None,
+                accent_fallback=settings.accent_service_fallback,
+                accent_retry_sec=settings.accent_service_retry_sec,
+            )
     return _frontend
 
 
-def _get_tts():
-    global _tts
-    if _tts is None:
-        _tts = XTTSBackend(settings.models_dir)
-    return _tts
+def _get_pool() -> ModelPool:
+    global _pool
+    with _init_lock:
+        if _pool is None:
+            _pool = ModelPool(settings.models_dir, settings.model_pool_budget_mb, settings.xtts_use_fast_checkpoint, node=_node)
+    return _pool
+
+
+def _get_tts(checkpoint: str | None = None) -> XTTSBackend:
+    """Stock XTTS, or the fine-tuned model in `checkpoint`, from this process's model pool."""
+    return _get_pool().get(checkpoint)
+
+
+def _get_batcher() -> MicroBatcher:
+    global _batcher
+    with _init_lock:
+        if _batcher is None:
+            _batcher = MicroBatcher(settings.microbatch_window_ms, settings.microbatch_max_size)
+    return _batcher
+
+
+def _profile_checkpoint(db, profile_id: str | None) -> str | None:
+    return model_registry.profile_checkpoint(db.get(VoiceProfile, profile_id)) if profile_id else None
+
+
+@worker_init.connect
+def _preload_models(sender=None, **_):
+    """Load models in the prefork parent so pool children share the weights copy-on-write."""
+    global _node
+    _node = getattr(sender, 'hostname', None)
+    if not (settings.worker_preload_tts or settings.worker_preload_frontend):
+        return
+    consume_from = getattr(sender.app.amqp.queues, 'consume_from', None) or {}
+    if consume_from and not ({settings.celery_preview_queue, settings.celery_render_queue} & set(consume_from)):
+        return
+    if settings.worker_preload_tts:
+        _get_tts()._load()
+    if settings.worker_preload_frontend:
+        _get_frontend()
+    # Everything allocated so far goes to the permanent generation: the cyclic GC stops
+    # touching those object headers, which would otherwise dirty (and copy) shared pages.
+    gc.collect()
+    gc.freeze()
+    logger.info('Preloaded models in worker parent: %s', metrics.process_memory())
+
+
+def _report_memory() -> None:
+    mem = metrics.process_memory()
+    labels = {'hostname': socket.gethostname(), 'pid': os.getpid()}
+    for kind, value in mem.items():
+        metrics.set_gauge(f'voiceai_worker_process_{kind}_bytes', value, **labels)
+
 
+@worker_process_init.connect
+def _on_child_start(**_):
+    _report_memory()
+    logger.info('Worker child %s memory: %s', os.getpid(), metrics.process_memory())
 
-def _profile_refs(db, voice_id: str, profile_id: str | None = None) -> list[str]:
-    if profile_id:
-        profile = db.get(VoiceProfile, profile_id)
-        if profile and profile.params.get('speaker_wavs'):
-            return profile.params['speaker_wavs']
-    return [x.normalized_path for x in db.execute(select(VoiceSample).where(VoiceSample.voice_id == voice_id)).scalars().all()]
+
+@task_postrun.connect
+def _on_task_done(**_):
+    _report_memory()
+    if _pool is not None and _node:
+        model_registry.refresh([k for k in _pool.held() if k != 'stock'], _node, os.getpid())
+
+
+# task_id -> (task span, contextvar token), between task_prerun and task_postrun.
+_task_spans: dict = {}
+
+
+def _request_header(task, name: str):
+    value = getattr(task.request, name, None)
+    return value if value is not None else (task.request.headers or {}).get(name)
+
+
+@task_prerun.connect
+def _trace_task_start(task_id=None, task=None, **_):
+    parent = tracing.parse_traceparent(_request_header(task, tracing.TRACEPARENT))
+    now = time.time_ns()
+    enqueued_at = _request_header(task, tracing.ENQUEUED_AT)
+    if parent and enqueued_at:
+        # Time the message spent in the broker, as its own span next to the execution.
+        wait = tracing.start('queue.wait', parent=parent, start_ns=int(enqueued_at), queue=task.request.delivery_info.get('routing_key', ''))
+        tracing.finish(wait, end_ns=now)
+    span = tracing.start(f'task {task.name}', parent=parent, start_ns=now, task_id=task_id, worker=_node or socket.gethostname())
+    if span is not None:
+        _task_spans[task_id] = (span, tracing.activate(span))
+
+
+@task_postrun.connect
+def _trace_task_end(task_id=None, state=None, **_):
+    entry = _task_spans.pop(task_id, None)
+    if entry is None:
+        return
+    span, token = entry
+    tracing.deactivate(token)
+    span.set(state=state or '')
+    if state == 'FAILURE':
+        span.error = 'task failed'
+    tracing.finish(span)
+
+
+@worker_process_shutdown.connect
+def _on_child_exit(**_):
+    labels = {'hostname': socket.gethostname(), 'pid': os.getpid()}
+    for kind in ('rss', 'pss', 'uss'):
+        metrics.remove(f'voiceai_worker_process_{kind}_bytes', **labels)
+    if _pool is not None:
+        _pool.release_all()
 
 
 @celery_app.task(bind=True, name='app.workers.tasks.run_preview')
@@ -46,46 +173,21 @@ def run_preview(self, job_id: str, payload: dict):
         job.status = JobStatus.running
         job.progress = 10
         db.commit()
-        frontend = _get_frontend()
-        input_mode = payload.get('input_mode', 'text')
-        if input_mode == 'phoneme':
-            if not payload.get('phoneme_text'):
-                raise RuntimeError('phoneme_text is required when input_mode=phoneme')
-            decoded_text = frontend.phonemes_to_text(payload['phoneme_text'])
-            # Even in phoneme mode, keep accent pipeline active so user overrides
-            # and manual stress settings from UI are not silently ignored.
-            prepared = frontend.preprocess(
-                decoded_text,
-                payload.get('use_accenting', True),
-                payload.get('use_user_overrides', True),
-                payload.get('accent_mode', 'auto_plus_overrides'),
-            )
-        else:
-            prepared = frontend.preprocess(
-                payload['text'],
-                payload.get('use_accenting', True),
-                payload.get('use_user_overrides', True),
-                payload.get('accent_mode', 'auto_plus_overrides'),
-            )
-        stress_hint_mode = payload.get('stress_hint_mode', 'none')
-        backend_text = frontend.to_tts_stress_format(prepared, mode=stress_hint_mode)
-        job.input_params = {
-            **(job.input_params or {}),
-            'input_mode': input_mode,
-            'decoded_phoneme_text': decoded_text if input_mode == 'phoneme' else None,
-            'prepared_text': prepared,
-            'backend_text': backend_text,
-            'stress_hint_mode': stress_hint_mode,
-        }
+        with tracing.span('frontend.prepare', chars=len(payload.get('text') or '')):
+            prepared = prepare_text(_get_frontend(), payload)
+        job.input_params = slim_params({**(job.input_params or {}), **prepared})
         db.commit()
 
-        refs = _profile_refs(db, payload['voice_id'])
-        if not refs:
-            raise RuntimeError('No reference samples for preview')
+        refs = profile_refs(db, payload['voice_id'])
         out_dir = Path(settings.outputs_dir)
         out_dir.mkdir(parents=True, exist_ok=True)
         output = str(out_dir / f'{job_id}.wav')
-        _get_tts().tts_to_file(text=backend_text, output_wav=output, speed=1.0, speaker_wavs=refs)
+        started = time.perf_counter()
+        with tracing.span('tts.synthesize', chars=len(prepared['backend_text'])):
+            render_preview(_get_tts(), prepared['backend_text'], refs, output)
+        admission.observe_rtf(settings.celery_preview_queue, time.perf_counter() - started, wav_duration(output))
+        if payload.get('preview_cache_key'):
+            PreviewCache(settings.previews_dir).put(payload['voice_id'], payload['preview_cache_key'], output)
         job.status = JobStatus.done
         job.progress = 100
         job.output_path = output
@@ -102,6 +204,40 @@ def run_preview(self, job_id: str, payload: dict):
         raise
     finally:
         db.close()
+        admission.release(job_id)
+
+
+@celery_app.task(bind=True, name='app.workers.tasks.check_speculative_preview')
+def check_speculative_preview(self, session_id: str):
+    """Debounce timer of speculative previews: hands a draft that stopped changing to the render task."""
+    if speculative_preview.stable_draft(session_id) is None:
+        return {'skipped': True}
+    speculative_preview.send_render(session_id)
+    return {'scheduled': True}
+
+
+@celery_app.task(bind=True, name='app.workers.tasks.run_speculative_preview')
+def run_speculative_preview(self, session_id: str):
+    """Render a UI session's preview draft ahead of the Preview click once it stopped changing."""
+    draft = speculative_preview.stable_draft(session_id)
+    if draft is None:
+        return {'skipped': True}
+    key, payload, since = draft
+    try:
+        if not speculative_preview.claim(session_id, key, payload['voice_id']):
+            return {'skipped': True}
+        db = SessionLocal()
+        try:
+            job = TTSJob(type=JobType.preview, status=JobStatus.pending, input_params={**payload, 'speculative': True, 'ui_session_id': session_id})
+            db.add(job)
+            db.commit()
+            job_id = job.id
+        finally:
+            db.close()
+        speculative_preview.remember_job(key, job_id)
+        return run_preview(job_id, payload)
+    finally:
+        speculative_preview.release(session_id, since)
 
 
 @celery_app.task(bind=True, name='app.workers.tasks.run_train')
@@ -112,7 +248,7 @@ def run_train(self, job_id: str, voice_id: str, profile_name: str):
         job.status = JobStatus.running
         job.progress = 10
         db.commit()
-        refs = _profile_refs(db, voice_id)
+        refs = profile_refs(db, voice_id)
         if not refs:
             raise RuntimeError('No samples for profile improve')
         profile = VoiceProfile(voice_id=voice_id, name=profile_name, status='building', params={'legacy': False, 'speaker_wavs': refs})
@@ -129,6 +265,10 @@ def run_train(self, job_id: str, voice_id: str, profile_name: str):
         job.output_path = profile.model_path
         db.add(Artifact(job_id=job_id, kind='profile', path=profile.model_path, meta={'backend': 'xtts_v2'}))
         db.commit()
+        # A new profile changes the voice's conditioning, so cached previews are stale.
+        PreviewCache(settings.previews_dir).invalidate(voice_id)
+        if settings.precompute_default_preview:
+            enqueue_default_preview(db, voice_id)
         return {'profile_id': profile.id}
     except Exception as exc:
         db.rollback()
@@ -142,83 +282,315 @@ def run_train(self, job_id: str, voice_id: str, profile_name: str):
         db.close()
 
 
-@celery_app.task(bind=True, name='app.workers.tasks.run_tts')
+def _drop_hls(playlist: HLSPlaylist, job_id: str, exc: Exception) -> None:
+    """HLS is only a progress preview: end the stream and let the render go on without it."""
+    logger.warning('HLS stream of %s stopped, rendering continues without it: %s', job_id, exc)
+    metrics.incr('voiceai_hls_failures_total')
+    playlist.abort()
+
+
+# acks_late + reject_on_worker_lost: a worker killed mid-render leaves the message
+# unacknowledged, so the broker redelivers it and the chunk manifest resumes the job.
+@celery_app.task(bind=True, name='app.workers.tasks.run_tts', acks_late=True, reject_on_worker_lost=True)
 def run_tts(self, job_id: str, payload: dict):
     db = SessionLocal()
+    playlist = None
     try:
         job = db.get(TTSJob, job_id)
         job.status = JobStatus.running
         job.progress = 5
         db.commit()
         frontend = _get_frontend()
-        input_mode = payload.get('input_mode', 'text')
-        if input_mode == 'phoneme':
-            if not payload.get('phoneme_text'):
-                raise RuntimeError('phoneme_text is required when input_mode=phoneme')
-            decoded_text = frontend.phonemes_to_text(payload['phoneme_text'])
-            prepared = frontend.preprocess(
-                decoded_text,
-                payload['use_accenting'],
-                payload['use_user_overrides'],
-                payload.get('accent_mode', 'auto_plus_overrides'),
-            )
-        else:
-            prepared = frontend.preprocess(
-                payload['text'],
-                payload['use_accenting'],
-                payload['use_user_overrides'],
-                payload.get('accent_mode', 'auto_plus_overrides'),
-            )
-        stress_hint_mode = payload.get('stress_hint_mode', 'none')
-        backend_text = frontend.to_tts_stress_format(prepared, mode=stress_hint_mode)
-        job.input_params = {
-            **(job.input_params or {}),
-            'input_mode': input_mode,
-            'decoded_phoneme_text': decoded_text if input_mode == 'phoneme' else None,
-            'prepared_text': prepared,
-            'backend_text': backend_text,
-            'stress_hint_mode': stress_hint_mode,
-        }
-        db.commit()
-        parts = frontend.split_poem(backend_text) if payload['mode'] == 'poem' else frontend.split_story(backend_text)
-        refs = _profile_refs(db, payload['voice_id'], payload.get('profile_id'))
+        decoded_text = decode_input(frontend, payload)
+        # Donors: an interrupted attempt of this job, then the job an edited text is based on.
+        donors = [
+            ChunkManifest(str(Path(settings.jobs_dir) / payload[k]))
+            for k in ('resume_job_id', 'base_job_id')
+            if payload.get(k)
+        ]
+        # Keep the previous render's chunk boundaries wherever the text is unchanged.
+        anchors = frozenset().union(*(d.texts() for d in donors))
+        refs = profile_refs(db, payload['voice_id'], payload.get('profile_id'))
         if not refs:
             raise RuntimeError('No references found for selected voice/profile')
+        checkpoint = _profile_checkpoint(db, payload.get('profile_id'))
+        tts = _get_tts(checkpoint)
         out_dir = Path(settings.jobs_dir) / job_id
         out_dir.mkdir(parents=True, exist_ok=True)
+        manifest = ChunkManifest(str(out_dir))
+        # restore() and record() both rewrite the manifest file, from different stages.
+        manifest_lock = threading.Lock()
+        params_hash = render_params_hash({
+            'backend': 'xtts_v2',
+            'language': 'ru',
+            'speed': payload['speed'],
+            'refs_hash': XTTSBackend._hash_paths(refs),
+            'checkpoint': model_registry.checkpoint_key(checkpoint),
+        })
+        pause_line = 260 if payload['mode'] == 'story' else 350
+        pause_stanza = 550 if payload['mode'] == 'story' else 900
+        # Chunks are also published as HLS segments while the job runs, for progressive playback.
+        if settings.hls_enabled:
+            playlist = HLSPlaylist(str(out_dir), settings.hls_target_duration, settings.hls_bitrate_kbps, sample_rate=tts.sample_rate)
+            try:
+                playlist.reset()
+            except Exception as exc:
+                _drop_hls(playlist, job_id, exc)
+                playlist = None
+        batcher = _get_batcher() if settings.microbatch_enabled else None
+        conditioning = None if batcher is not None else tts.get_conditioning(refs)
+        # The text is prepared block by block (frontend stage), each chunk synthesized as soon as
+        # its block is ready (synthesis stage) and written, recorded and segmented while the next
+        # one renders (post stage, this thread, which owns the DB session).
+        blocks: list[dict] = []
+        source_text = decoded_text if decoded_text is not None else payload['text']
+        total_chars = max(len(source_text), 1)
+
+        def chunks():
+            idx = 0
+            for block in split_blocks(source_text, settings.render_pipeline_block_chars):
+                with tracing.span('frontend.prepare', chars=len(block)):
+                    # The block is already plain text, even when the job came in as phonemes.
+                    prepared = prepare_text(frontend, {**payload, 'input_mode': 'text', 'text': block})
+                    backend_text = prepared['backend_text']
+                    if payload['mode'] == 'poem':
+                        # Poem lines each carry their own line pause, so only overlong lines are split.
+                        parts = frontend.plan_chunks(frontend.split_poem(backend_text), settings.chunk_min_chars, settings.chunk_max_chars, merge=False)
+                    else:
+                        parts = frontend.plan_chunks(frontend.split_story(backend_text), settings.chunk_min_chars, settings.chunk_max_chars, anchors=anchors)
+                blocks.append(prepared)
+                for part in parts:
+                    if part == '__STANZA_BREAK__':
+                        yield None, part, None
+                        continue
+                    idx += 1
+                    yield idx, part, chunk_key(part, params_hash)
+
+        # Model time is counted per stage (each written by one thread) and summed after the run.
+        synth_stage_sec = post_wait_sec = audio_sec = 0.0
+
+        def synthesize(item):
+            nonlocal synth_stage_sec
+            idx, part, key = item
+            if idx is None:
+                return item, None
+            with tracing.span('tts.chunk', index=idx, chars=len(part)) as span:
+                with manifest_lock:
+                    restored = manifest.restore(idx, key, str(out_dir / f'chunk_{idx}.wav'), donors, text=part)
+                if restored:
+                    if span is not None:
+                        span.set(reused=True)
+                    return item, None
+                if batcher is not None:
+                    # Handed to the shared batcher; the post stage waits for the result.
+                    return item, batcher.submit(tts, refs, part, payload['speed'])
+                started = time.perf_counter()
+                wav_data = tts.synthesize(part, conditioning, payload['speed'])
+                synth_stage_sec += time.perf_counter() - started
+                return item, wav_data
+
         chunk_paths = []
-        usable = [x for x in parts if x != '__STANZA_BREAK__']
-        total = max(len(usable), 1)
+        lead_ms = 0
         idx = 0
-        for part in parts:
-            if part == '__STANZA_BREAK__':
+        reused = 0
+        done_chars = 0
+
+        def post(result):
+            nonlocal lead_ms, idx, reused, post_wait_sec, audio_sec, done_chars, playlist
+            (n, part, key), wav_data = result
+            if n is None:
                 chunk_paths.append('__STANZA_BREAK__')
-                continue
-            idx += 1
-            wav = str(out_dir / f'chunk_{idx}.wav')
-            _get_tts().tts_to_file(text=part, output_wav=wav, speed=payload['speed'], speaker_wavs=refs)
+                lead_ms += pause_stanza
+                return
+            idx = n
+            wav = str(out_dir / f'chunk_{n}.wav')
+            if wav_data is None:
+                reused += 1
+            else:
+                if isinstance(wav_data, Future):
+                    started = time.perf_counter()
+                    wav_data = wav_data.result()
+                    post_wait_sec += time.perf_counter() - started
+                tmp_wav = str(out_dir / f'chunk_{n}.tmp.wav')
+                tts.write_output(wav_data, tmp_wav)
+                audio_sec += len(wav_data) / tts.sample_rate
+                os.replace(tmp_wav, wav)
+                with manifest_lock:
+                    manifest.record(n, key, wav, text=part)
             chunk_paths.append(wav)
-            job.progress = min(95, int((idx / total) * 90) + 5)
+            if playlist is not None:
+                try:
+                    with tracing.span('hls.segment', index=n):
+                        playlist.add(wav, wav_duration(wav), lead_ms=lead_ms, tail_ms=pause_line)
+                except Exception as exc:
+                    _drop_hls(playlist, job_id, exc)
+                    playlist = None
+            lead_ms = 0
+            # The chunk count is not known up front, so progress follows the share of text rendered.
+            done_chars += len(part)
+            job.progress = min(95, int(min(done_chars / total_chars, 1.0) * 90) + 5)
             db.commit()
 
+        def discard(result):
+            # Chunks still queued on the batcher are not rendered for a job that already failed.
+            if isinstance(result[1], Future):
+                result[1].cancel()
+
+        # With micro-batching the synthesis stage only queues chunks, so let it run further ahead.
+        pipeline = RenderPipeline(settings.render_pipeline_depth, settings.microbatch_max_size if batcher is not None else None)
+        with tracing.span('render.pipeline') as span:
+            pipeline.run(chunks(), synthesize, post, discard)
+            stages = pipeline.stats()
+            if span is not None:
+                span.set(**{f'{name}.utilization': s['utilization'] for name, s in stages.items()})
+        for name, s in stages.items():
+            metrics.incr('voiceai_render_stage_busy_seconds_total', s['busy_sec'], stage=name)
+            metrics.incr('voiceai_render_stage_wait_seconds_total', s['wait_in_sec'] + s['wait_out_sec'], stage=name)
+        metrics.incr('voiceai_render_pipeline_seconds_total', pipeline.wall)
+        logger.info('Render %s pipeline %.1fs: %s', job_id, pipeline.wall, ', '.join(f"{name} {s['utilization']:.0%}" for name, s in stages.items()))
+
+        admission.observe_rtf(settings.celery_render_queue, synth_stage_sec + post_wait_sec, audio_sec)
+        prepared = {
+            'input_mode': payload.get('input_mode', 'text'),
+            'decoded_phoneme_text': decoded_text,
+            'prepared_text': ' '.join(b['prepared_text'] for b in blocks),
+            'backend_text': ' '.join(b['backend_text'] for b in blocks),
+            'stress_hint_mode': payload.get('stress_hint_mode', 'none'),
+        }
+        job.input_params = slim_params({
+            **(job.input_params or {}),
+            **prepared,
+            'chunks_total': idx,
+            'chunks_reused': reused,
+            'pipeline': {'wall_sec': round(pipeline.wall, 3), 'stages': stages},
+        })
+        db.commit()
+
         final_ext = payload['format']
         final_path = str(Path(settings.outputs_dir) / f'{job_id}.{final_ext}')
-        temp_wav = str(Path(settings.outputs_dir) / f'{job_id}.wav')
-        pause_line = 260 if payload['mode'] == 'story' else 350
-        pause_stanza = 550 if payload['mode'] == 'story' else 900
-        concat_with_pauses(chunk_paths, temp_wav, line_pause_ms=pause_line, stanza_pause_ms=pause_stanza)
-        if final_ext == 'mp3':
-            _get_tts().transcode_if_needed(temp_wav, final_path)
-            os.remove(temp_wav)
+        temp_wav = str(out_dir / 'concat.wav')
+        with tracing.span('audio.concat', chunks=idx):
+            concat_with_pauses(chunk_paths, temp_wav, line_pause_ms=pause_line, stanza_pause_ms=pause_stanza)
+        sample_rate = payload.get('sample_rate') or settings.output_sample_rate
+        bitrate_kbps = payload.get('bitrate_kbps')
+        if bitrate_kbps is None:
+            bitrate_kbps = settings.mp3_bitrate_kbps if final_ext == 'mp3' else settings.opus_bitrate_kbps
+        with tracing.span('audio.transcode', format=final_ext):
+            encoded = tts.transcode_if_needed(temp_wav, final_path, sample_rate=sample_rate, bitrate_kbps=bitrate_kbps)
+        if encoded == temp_wav:
+            os.replace(temp_wav, final_path)
         else:
-            final_path = temp_wav
+            os.remove(temp_wav)
+        if playlist is not None:
+            try:
+                playlist.finish()
+            except Exception as exc:
+                _drop_hls(playlist, job_id, exc)
+                playlist = None
 
         job.status = JobStatus.done
         job.progress = 100
         job.output_path = final_path
-        db.add(Artifact(job_id=job_id, kind='tts', path=final_path, meta={'backend': 'xtts_v2', 'mode': payload['mode']}))
+        db.add(Artifact(job_id=job_id, kind='tts', path=final_path, meta={'backend': 'xtts_v2', 'mode': payload['mode'], 'format': final_ext, 'sample_rate': sample_rate, 'bitrate_kbps': bitrate_kbps if final_ext != 'wav' else None, 'chunks_total': idx, 'chunks_reused': reused}))
         db.commit()
         return {'output': final_path}
+    except Exception as exc:
+        if playlist is not None:
+            # Close the stream so HLS players stop polling a render that will not continue.
+            playlist.abort()
+        db.rollback()
+        job = db.get(TTSJob, job_id)
+        if job:
+            job.status = JobStatus.failed
+            job.error_text = str(exc)
+            db.commit()
+        raise
+    finally:
+        db.close()
+        admission.release(job_id)
+
+
+@celery_app.task(bind=True, name='app.workers.tasks.run_tts_batch', acks_late=True, reject_on_worker_lost=True)
+def run_tts_batch(self, job_id: str, payload: dict):
+    db = SessionLocal()
+    try:
+        job = db.get(TTSJob, job_id)
+        job.status = JobStatus.running
+        job.progress = 5
+        db.commit()
+        frontend = _get_frontend()
+        stress_hint_mode = payload.get('stress_hint_mode', 'none')
+        texts = []
+        with tracing.span('frontend.prepare', items=len(payload['texts'])):
+            for text in payload['texts']:
+                prepared = frontend.preprocess(
+                    text,
+                    payload['use_accenting'],
+                    payload['use_user_overrides'],
+                    payload.get('accent_mode', 'auto_plus_overrides'),
+                )
+                texts.append(frontend.to_tts_stress_format(prepared, mode=stress_hint_mode))
+        refs = profile_refs(db, payload['voice_id'], payload.get('profile_id'))
+        if not refs:
+            raise RuntimeError('No references found for selected voice/profile')
+
+        tts = _get_tts(_profile_checkpoint(db, payload.get('profile_id')))
+        # With micro-batching the scheduler thread owns the model; phrases go through it.
+        batcher = _get_batcher() if settings.microbatch_enabled else None
+        # One conditioning pass for the whole batch; every phrase reuses it.
+        conditioning = None if batcher is not None else tts.get_conditioning(refs)
+        out_dir = Path(settings.outputs_dir) / job_id
+        out_dir.mkdir(parents=True, exist_ok=True)
+        fmt = payload['format']
+        sample_rate = payload.get('sample_rate') or settings.output_sample_rate
+        bitrate_kbps = payload.get('bitrate_kbps')
+        if bitrate_kbps is None:
+            bitrate_kbps = settings.mp3_bitrate_kbps if fmt == 'mp3' else settings.opus_bitrate_kbps
+        # Similar lengths share a mini-batch so little of each batch is padding.
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        batch_size = max(settings.tts_batch_size, 1)
+        items = []
+        synth_sec = audio_sec = 0.0
+        for start in range(0, len(order), batch_size):
+            group = order[start:start + batch_size]
+            started = time.perf_counter()
+            with tracing.span('tts.batch', items=len(group), chars=sum(len(texts[i]) for i in group)):
+                group_texts = [texts[i] for i in group]
+                if batcher is not None:
+                    wavs = list(batcher.map_ordered(tts, refs, group_texts, payload['speed'], lookahead=len(group)))
+                else:
+                    wavs = tts.synthesize_batch(group_texts, conditioning, speed=payload['speed'])
+            synth_sec += time.perf_counter() - started
+            audio_sec += sum(len(w) for w in wavs) / tts.sample_rate
+            for i, wav in zip(group, wavs):
+                wav_path = str(out_dir / f'item_{i + 1:04d}.wav')
+                tts.write_output(wav, wav_path)
+                final_path = str(out_dir / f'item_{i + 1:04d}.{fmt}')
+                with tracing.span('audio.transcode', format=fmt, index=i):
+                    encoded = tts.transcode_if_needed(wav_path, final_path, sample_rate=sample_rate, bitrate_kbps=bitrate_kbps)
+                if encoded != wav_path:
+                    os.remove(wav_path)
+                items.append((i, final_path))
+            job.progress = min(95, int(((start + len(group)) / len(order)) * 90) + 5)
+            db.commit()
+
+        admission.observe_rtf(settings.celery_render_queue, synth_sec, audio_sec)
+        items.sort()
+        for i, path in items:
+            db.add(Artifact(job_id=job_id, kind='tts_batch_item', path=path, meta={'index': i, 'text': payload['texts'][i][:200], 'format': fmt}))
+        output = str(out_dir)
+        if payload.get('archive'):
+            output = str(Path(settings.outputs_dir) / f'{job_id}.zip')
+            # Audio is already compressed (or PCM that deflates poorly); store without recompressing.
+            with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as zf:
+                for _, path in items:
+                    zf.write(path, arcname=Path(path).name)
+            db.add(Artifact(job_id=job_id, kind='tts_batch_archive', path=output, meta={'items': len(items)}))
+        job.status = JobStatus.done
+        job.progress = 100
+        job.output_path = output
+        db.commit()
+        return {'output': output, 'items': len(items)}
     except Exception as exc:
         db.rollback()
         job = db.get(TTSJob, job_id)
@@ -229,3 +601,4 @@ def run_tts(self, job_id: str, payload: dict):
         raise
     finally:
         db.close()
+        admission.release(job_id)
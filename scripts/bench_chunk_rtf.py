@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Measure XTTS real-time factor (synthesis time / audio duration) against chunk length.
+
+Runs the chunk planner with different character windows over the same text and
+synthesizes every chunk with the CPU backend:
+  python scripts/bench_chunk_rtf.py --speaker-wav /opt/voice-ai/data/voices/<id>/<sample>_clean.wav
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import get_settings  # noqa: E402
+from app.services.text.frontend import RussianTextFrontend  # noqa: E402
+from app.services.tts_backend import XTTSBackend  # noqa: E402
+
+DEFAULT_TEXT = (
+    'Жила-была девочка Машенька. Да. Однажды собрались подружки в лес по грибы, по ягоды, '
+    'и пришли звать с собой Машеньку, а дедушка с бабушкой долго не отпускали её, но потом '
+    'всё-таки согласились и сказали, чтобы она от подружек не отставала. Пришли девушки в лес. '
+    'Стали собирать грибы и ягоды. Вот Машенька — деревце за деревцем, кустик за кустиком — '
+    'и ушла далеко-далеко от подружек. Стала она аукаться, стала их звать. А подружки не слышат, '
+    'не отзываются. Ходила, ходила Машенька по лесу — совсем заблудилась.'
+)
+
+
+def _wav_seconds(path: str) -> float:
+    with wave.open(path, 'rb') as wf:
+        return wf.getnframes() / float(wf.getframerate())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark XTTS real-time factor by chunk length.')
+    parser.add_argument('--speaker-wav', action='append', required=True, help='Reference sample (repeatable)')
+    parser.add_argument('--text-file', help='UTF-8 text to render (default: built-in story excerpt)')
+    parser.add_argument('--windows', default='40,80,120,180,240', help='Comma-separated max chunk lengths')
+    parser.add_argument('--speed', type=float, default=1.0)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    text = Path(args.text_file).read_text(encoding='utf-8') if args.text_file else DEFAULT_TEXT
+    text = ' '.join(text.split())
+    sentences = RussianTextFrontend.split_story(text)
+    backend = XTTSBackend(settings.models_dir, prefer_fast_checkpoint=settings.xtts_use_fast_checkpoint)
+
+    print('Warming up model...')
+    with tempfile.TemporaryDirectory() as tmp:
+        backend.tts_to_file(text='Проверка.', output_wav=str(Path(tmp) / 'warmup.wav'), speed=args.speed, speaker_wavs=args.speaker_wav)
+
+        print(f"{'max_chars':>9} {'chunks':>6} {'avg_chars':>9} {'audio_s':>8} {'synth_s':>8} {'rtf':>6}")
+        for max_chars in [int(x) for x in args.windows.split(',') if x.strip()]:
+            chunks = RussianTextFrontend.plan_chunks(sentences, min_chars=max_chars // 2, max_chars=max_chars)
+            audio_s = 0.0
+            synth_s = 0.0
+            for i, chunk in enumerate(chunks):
+                out = str(Path(tmp) / f'{max_chars}_{i}.wav')
+                started = time.perf_counter()
+                backend.tts_to_file(text=chunk, output_wav=out, speed=args.speed, speaker_wavs=args.speaker_wav)
+                synth_s += time.perf_counter() - started
+                audio_s += _wav_seconds(out)
+            avg_chars = sum(len(c) for c in chunks) / max(len(chunks), 1)
+            rtf = synth_s / audio_s if audio_s else float('nan')
+            print(f'{max_chars:>9} {len(chunks):>6} {avg_chars:>9.1f} {audio_s:>8.1f} {synth_s:>8.1f} {rtf:>6.2f}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
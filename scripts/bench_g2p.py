@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Check and benchmark the table-driven G2P encoder/decoder.
+
+Compares RussianTextFrontend.text_to_phonemes/phonemes_to_text with the original
+per-character implementation on random and real text, then reports throughput:
+  python scripts/bench_g2p.py --text-file manuscript.txt
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.text.frontend import RussianTextFrontend  # noqa: E402
+
+CHAR_TO_TOKEN = RussianTextFrontend._G2P_CHAR_TO_TOKEN
+TOKEN_TO_CHAR = RussianTextFrontend._G2P_TOKEN_TO_CHAR
+ALPHABET = ''.join(CHAR_TO_TOKEN) + ''.join(CHAR_TO_TOKEN).upper() + ' \n\t,.!?;:—-«»0123456789́+|xyzAB'
+
+
+def legacy_text_to_phonemes(text: str) -> str:
+    text = re.sub(r'\s+', ' ', text).strip()
+    out = []
+    for ch in text:
+        if ch == ' ':
+            out.append('|')
+            continue
+        if ch == '́':
+            out.append('+')
+            continue
+        token = CHAR_TO_TOKEN.get(ch.lower())
+        out.append(ch if token is None else token)
+    return ' '.join(out)
+
+
+def legacy_phonemes_to_text(phoneme_text: str) -> str:
+    chars: list[str] = []
+    vowels = set('аеёиоуыэюя')
+    stress_next = False
+    for token in phoneme_text.split():
+        if token == '|':
+            chars.append(' ')
+            stress_next = False
+            continue
+        if token == '+':
+            if chars and chars[-1] in vowels:
+                chars.append('́')
+                stress_next = False
+            else:
+                stress_next = True
+            continue
+        ch = TOKEN_TO_CHAR.get(token.upper())
+        if ch is None:
+            chars.append(token)
+            stress_next = False
+            continue
+        chars.append(ch)
+        if stress_next and ch in vowels:
+            chars.append('́')
+        stress_next = False
+    text = ''.join(chars)
+    text = re.sub(r'\s+([,.;:!?])', r'\1', text)
+    text = re.sub(r'([,.;:!?])(\S)', r'\1 \2', text)
+    return text
+
+
+def random_phonemes(rng: random.Random, n: int) -> str:
+    tokens = list(TOKEN_TO_CHAR) + ['|', '+', '+', 'а', 'xа', ',', '.', '!', 'abc', 'yo', 'Sch']
+    return ' '.join(rng.choice(tokens) for _ in range(n))
+
+
+def check(frontend: RussianTextFrontend, samples: int, seed: int) -> int:
+    rng = random.Random(seed)
+    failures = 0
+    for _ in range(samples):
+        text = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 80)))
+        phonemes = random_phonemes(rng, rng.randint(0, 40))
+        cases = [
+            ('encode', text, frontend.text_to_phonemes(text), legacy_text_to_phonemes(text)),
+            ('decode', phonemes, frontend.phonemes_to_text(phonemes), legacy_phonemes_to_text(phonemes)),
+            ('roundtrip', text, frontend.phonemes_to_text(frontend.text_to_phonemes(text)),
+             legacy_phonemes_to_text(legacy_text_to_phonemes(text))),
+        ]
+        for name, source, got, expected in cases:
+            if got != expected:
+                failures += 1
+                if failures <= 5:
+                    print(f'MISMATCH {name}: {source!r}\n  got      {got!r}\n  expected {expected!r}')
+    return failures
+
+
+def bench(name: str, fn, lines: list[str]) -> None:
+    chars = sum(len(line) for line in lines)
+    started = time.perf_counter()
+    for line in lines:
+        fn(line)
+    elapsed = time.perf_counter() - started
+    print(f'{name:<28} {elapsed:>8.3f}s {chars / elapsed / 1e6:>8.2f} Mchar/s')
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Check and benchmark bulk G2P.')
+    parser.add_argument('--text-file', help='UTF-8 text to convert (default: generated lines)')
+    parser.add_argument('--samples', type=int, default=20000, help='Random equivalence cases')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Overrides and the accent model are irrelevant for G2P; skip loading them.
+    frontend = RussianTextFrontend.__new__(RussianTextFrontend)
+    failures = check(frontend, args.samples, args.seed)
+    print(f'equivalence: {args.samples} samples, {failures} mismatches')
+
+    if args.text_file:
+        lines = Path(args.text_file).read_text(encoding='utf-8').splitlines()
+    else:
+        rng = random.Random(args.seed)
+        words = ['Жила-была', 'девочка', 'Ма́шенька,', 'лес', 'ягоды.', 'подружки', 'аукаться!']
+        lines = [' '.join(rng.choice(words) for _ in range(20)) for _ in range(20000)]
+    phoneme_lines = [legacy_text_to_phonemes(line) for line in lines]
+    for line, phonemes in zip(lines, phoneme_lines):
+        if frontend.phonemes_to_text(phonemes) != legacy_phonemes_to_text(phonemes):
+            failures += 1
+    bench('encode legacy', legacy_text_to_phonemes, lines)
+    bench('encode table-driven', frontend.text_to_phonemes, lines)
+    bench('decode legacy', legacy_phonemes_to_text, phoneme_lines)
+    bench('decode table-driven', frontend.phonemes_to_text, phoneme_lines)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
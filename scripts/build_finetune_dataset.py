@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Build an XTTS fine-tuning dataset from a voice's ingested samples.
+
+Every VoiceSample is decoded at 22.05 kHz, cut at pauses into 2..11 s clips and written to
+<output-dir>/wavs/ with a metadata.csv, the layout fine_tune_xtts.py expects.
+Samples are processed in parallel by a multiprocessing pool:
+  python scripts/build_finetune_dataset.py --voice-id <id> --output-dir /opt/voice-ai/data/datasets/<id> \
+      --transcripts transcripts.csv
+
+Samples carry no transcripts, so texts come from --transcripts (pipe-separated key|text, where
+key is a segment name, a sample id or a sample's source file name; sample-level texts apply
+only to samples that were not split). Segments without text are listed in
+needs_transcript.csv: fill it in, pass it as --transcripts and rerun.
+"""
+
+import argparse
+import csv
+import multiprocessing
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.audio.processing import REFERENCE_SAMPLE_RATE, reference_array_path, write_wav  # noqa: E402
+
+# XTTS-v2 trains on 22.05 kHz audio.
+SAMPLE_RATE = 22050
+
+
+def split_on_pauses(samples: np.ndarray, sample_rate: int, min_sec: float = 2.0, max_sec: float = 11.0) -> list[tuple[int, int]]:
+    """Cut a clip into [start, end) sample ranges of min_sec..max_sec, preferring the quietest 20 ms frames.
+
+    Each cut goes at the lowest-energy frame inside the allowed window, so segments end in
+    pauses rather than mid-word whenever the recording has any.
+    """
+    frame = sample_rate // 50
+    n = samples.size // frame
+    if samples.size <= max_sec * sample_rate or n == 0:
+        return [(0, samples.size)]
+    energy = np.sqrt(np.mean(samples[:n * frame].reshape(n, frame) ** 2, axis=1))
+    min_frames, max_frames = int(min_sec * 50), int(max_sec * 50)
+    bounds = []
+    start = 0
+    while n - start > max_frames:
+        window = energy[start + min_frames:start + max_frames]
+        cut = start + min_frames + int(np.argmin(window))
+        bounds.append((start * frame, cut * frame))
+        start = cut
+    if bounds and n - start < min_frames:
+        # A short tail joins the previous segment rather than becoming its own clip.
+        bounds[-1] = (bounds[-1][0], samples.size)
+    else:
+        bounds.append((start * frame, samples.size))
+    return bounds
+
+
+def _load_samples(path: str) -> np.ndarray:
+    cached = Path(reference_array_path(path))
+    if SAMPLE_RATE == REFERENCE_SAMPLE_RATE and cached.is_file():
+        return np.load(cached)
+    cmd = ['ffmpeg', '-v', 'error', '-i', path, '-ac', '1', '-ar', str(SAMPLE_RATE), '-f', 'f32le', '-']
+    return np.frombuffer(subprocess.run(cmd, check=True, capture_output=True).stdout, dtype='<f4')
+
+
+def _prepare(task: tuple) -> list[dict]:
+    """Pool worker: segment one sample and write its clips."""
+    sample_id, wav_path, wavs_dir, min_sec, max_sec = task
+    samples = _load_samples(wav_path)
+    out = []
+    for n, (start, end) in enumerate(split_on_pauses(samples, SAMPLE_RATE, min_sec, max_sec)):
+        clip = samples[start:end]
+        name = f'{sample_id}_{n:02d}'
+        write_wav(str(Path(wavs_dir) / f'{name}.wav'), clip, SAMPLE_RATE)
+        out.append({'name': name, 'sample_id': sample_id, 'audio_file': f'wavs/{name}.wav', 'duration_sec': round(clip.size / SAMPLE_RATE, 3)})
+    return out
+
+
+def _read_transcripts(path: str | None) -> dict[str, str]:
+    if not path:
+        return {}
+    with open(path, encoding='utf-8', newline='') as f:
+        return {row[0].strip(): row[1].strip() for row in csv.reader(f, delimiter='|') if len(row) >= 2 and row[1].strip()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Segment voice samples into an XTTS fine-tuning dataset.')
+    parser.add_argument('--voice-id', required=True)
+    parser.add_argument('--output-dir', required=True)
+    parser.add_argument('--transcripts', help='Pipe-separated key|text (segment name, sample id or source file name)')
+    parser.add_argument('--workers', type=int, default=max(multiprocessing.cpu_count() - 1, 1))
+    parser.add_argument('--min-sec', type=float, default=2.0)
+    parser.add_argument('--max-sec', type=float, default=11.0)
+    args = parser.parse_args()
+
+    from sqlalchemy import select
+
+    from app.db.session import SessionLocal
+    from app.models import VoiceSample
+
+    db = SessionLocal()
+    try:
+        samples = db.execute(select(VoiceSample).where(VoiceSample.voice_id == args.voice_id)).scalars().all()
+        rows = [(s.id, s.normalized_path, Path(s.source_path).name) for s in samples]
+    finally:
+        db.close()
+    if not rows:
+        raise SystemExit(f'No samples for voice {args.voice_id}')
+
+    output_dir = Path(args.output_dir)
+    wavs_dir = output_dir / 'wavs'
+    shutil.rmtree(wavs_dir, ignore_errors=True)
+    wavs_dir.mkdir(parents=True)
+    transcripts = _read_transcripts(args.transcripts)
+    source_names = {sample_id: source for sample_id, _, source in rows}
+
+    tasks = [(sample_id, path, str(wavs_dir), args.min_sec, args.max_sec) for sample_id, path, _ in rows]
+    labelled, missing = [], []
+    audio_sec = 0.0
+    started = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        for segments in pool.imap(_prepare, tasks):
+            whole = len(segments) == 1
+            for item in segments:
+                text = transcripts.get(item['name'])
+                if text is None and whole:
+                    text = transcripts.get(item['sample_id']) or transcripts.get(source_names[item['sample_id']])
+                item['text'] = text or ''
+                (labelled if text else missing).append(item)
+                audio_sec += item['duration_sec']
+    elapsed = time.perf_counter() - started
+
+    with open(output_dir / 'metadata.csv', 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f, delimiter='|').writerows((item['audio_file'], item['text']) for item in labelled)
+    with open(output_dir / 'needs_transcript.csv', 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f, delimiter='|').writerows((item['name'], '') for item in missing)
+
+    segments_total = len(labelled) + len(missing)
+    print(f'samples={len(rows)} segments={segments_total} transcribed={len(labelled)} audio_sec={audio_sec:.1f}')
+    print(f'workers={args.workers} wall_sec={elapsed:.2f} segments_per_sec={segments_total / elapsed:.1f} audio_sec_per_sec={audio_sec / elapsed:.1f}')
+    if missing:
+        print(f'{len(missing)} segments need transcripts: {output_dir / "needs_transcript.csv"}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Fail when importing or starting the API gets slow or pulls in heavy modules.
+
+Runs `python -X importtime -c 'import app.api.main'` in a fresh interpreter, prints the
+slowest top-level imports, then times the FastAPI startup handlers (warm-up disabled):
+  python scripts/check_import_budget.py --import-budget-ms 1500 --startup-budget-ms 300
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+# Only needed by specific endpoints or workers; none may be imported by `import app.api.main`.
+FORBIDDEN = ('ruaccent', 'pydub', 'celery', 'kombu', 'torch', 'TTS', 'transformers')
+
+_PROBE = '''
+import asyncio, json, sys, time
+started = time.perf_counter()
+import app.api.main as m
+imported = time.perf_counter()
+asyncio.run(m.app.router.startup())
+ready = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'startup_ms': (ready - imported) * 1000,
+    'modules': sorted(sys.modules),
+}))
+'''
+
+
+def parse_importtime(stderr: str) -> list[tuple[int, str]]:
+    """(cumulative microseconds, module) for top-level imports from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|', 2)
+        if not cumulative.strip().isdigit():
+            continue
+        # Nesting is shown by two extra spaces per level; keep direct imports of the probe only.
+        name = name[1:]
+        if not name.startswith(' '):
+            rows.append((int(cumulative), name.strip()))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Check API import/startup time budget.')
+    parser.add_argument('--import-budget-ms', type=float, default=1500)
+    parser.add_argument('--startup-budget-ms', type=float, default=300)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    env = {**os.environ, 'API_WARMUP': 'false', 'PYTHONPATH': str(ROOT)}
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr[-4000:], file=sys.stderr)
+        return 2
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    print(f"{'cumulative_ms':>13}  module")
+    for us, name in sorted(parse_importtime(proc.stderr), reverse=True)[:args.top]:
+        print(f'{us / 1000:>13.1f}  {name}')
+    print(f"\nimport app.api.main: {result['import_ms']:.0f} ms (budget {args.import_budget_ms:.0f})")
+    print(f"startup handlers:    {result['startup_ms']:.0f} ms (budget {args.startup_budget_ms:.0f})")
+
+    failures = []
+    heavy = sorted({m.split('.')[0] for m in result['modules']} & set(FORBIDDEN))
+    if heavy:
+        failures.append(f"heavy modules imported at API import time: {', '.join(heavy)}")
+    if result['import_ms'] > args.import_budget_ms:
+        failures.append('import budget exceeded')
+    if result['startup_ms'] > args.startup_budget_ms:
+        failures.append('startup budget exceeded')
+    for failure in failures:
+        print(f'FAIL: {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""One-time conversion of the stock XTTS-v2 checkpoint into a fast-start layout.
+
+Writes <models_dir>/xtts_v2_fast/{model.safetensors,config.json,vocab.json}. Workers then
+memory-map the weights instead of unpickling model.pth (see XTTSBackend._load).
+
+  python scripts/convert_xtts_fast.py           # convert
+  python scripts/convert_xtts_fast.py --bench   # convert, then compare cold start and peak RSS
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import get_settings  # noqa: E402
+from app.services.tts_backend import FAST_CHECKPOINT_DIRNAME, _ensure_torch_load_compat, stock_checkpoint_dir  # noqa: E402
+
+_BENCH_SNIPPET = '''
+import json, resource, time
+started = time.perf_counter()
+from app.core.config import get_settings
+from app.services.tts_backend import XTTSBackend
+s = get_settings()
+XTTSBackend(s.models_dir, prefer_fast_checkpoint=s.xtts_use_fast_checkpoint)._load()
+print(json.dumps({"seconds": time.perf_counter() - started, "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+'''
+
+
+def convert(source_dir: Path, target_dir: Path) -> None:
+    import torch
+    from safetensors.torch import save_file
+    from TTS.tts.configs.xtts_config import XttsConfig
+    from TTS.tts.models.xtts import Xtts
+
+    _ensure_torch_load_compat()
+    config = XttsConfig()
+    config.load_json(str(source_dir / 'config.json'))
+    model = Xtts.init_from_config(config)
+    # Same key filtering/upgrades Xtts.load_checkpoint applies, so the artifact loads strictly.
+    state = model.get_compatible_checkpoint_state_dict(str(source_dir / 'model.pth'))
+
+    tensors = {}
+    seen_storage = set()
+    for key, value in state.items():
+        if not isinstance(value, torch.Tensor):
+            continue
+        value = value.detach().cpu().contiguous()
+        # safetensors refuses aliased tensors; give tied weights their own copy.
+        ptr = value.untyped_storage().data_ptr()
+        if ptr in seen_storage:
+            value = value.clone()
+        seen_storage.add(ptr)
+        tensors[key] = value
+
+    target_dir.mkdir(parents=True, exist_ok=True)
+    tmp = target_dir / 'model.safetensors.tmp'
+    save_file(tensors, str(tmp), metadata={'source': str(source_dir / 'model.pth')})
+    os.replace(tmp, target_dir / 'model.safetensors')
+    for name in ('config.json', 'vocab.json'):
+        shutil.copyfile(source_dir / name, target_dir / name)
+    print(f'Wrote {len(tensors)} tensors to {target_dir}')
+
+
+def bench(fast: bool) -> dict:
+    env = {**os.environ, 'XTTS_USE_FAST_CHECKPOINT': 'true' if fast else 'false', 'COQUI_TOS_AGREED': '1'}
+    out = subprocess.run(
+        [sys.executable, '-c', _BENCH_SNIPPET],
+        cwd=str(Path(__file__).resolve().parents[1]), env=env, check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Convert XTTS-v2 into a memory-mappable fast-start artifact.')
+    parser.add_argument('--source-dir', help='Stock checkpoint dir (default: Coqui download of xtts_v2)')
+    parser.add_argument('--bench', action='store_true', help='Measure cold start and peak RSS of stock vs fast load')
+    args = parser.parse_args()
+
+    settings = get_settings()
+    source_dir = Path(args.source_dir) if args.source_dir else stock_checkpoint_dir()
+    target_dir = Path(settings.models_dir) / FAST_CHECKPOINT_DIRNAME
+    convert(source_dir, target_dir)
+
+    if args.bench:
+        # Run each variant twice and keep the second: both then read from a warm page cache.
+        results = {}
+        for label, fast in (('stock (torch.load)', False), ('fast (safetensors mmap)', True)):
+            bench(fast)
+            results[label] = bench(fast)
+        print(f"{'loader':<26} {'cold_start_s':>12} {'peak_rss_mb':>12}")
+        for label, r in results.items():
+            print(f"{label:<26} {r['seconds']:>12.2f} {r['peak_rss_mb']:>12.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -57,7 +57,7 @@ fi
 
 id -u voiceai >/dev/null 2>&1 || useradd --system --create-home --shell /bin/bash voiceai
 
-for d in /opt/voice-ai/app /opt/voice-ai/data /opt/voice-ai/data/voices /opt/voice-ai/data/profiles /opt/voice-ai/data/jobs /opt/voice-ai/data/uploads /opt/voice-ai/data/outputs /opt/voice-ai/data/models /opt/voice-ai/logs /opt/voice-ai/scripts /opt/voice-ai/config; do
+for d in /opt/voice-ai/app /opt/voice-ai/data /opt/voice-ai/data/voices /opt/voice-ai/data/profiles /opt/voice-ai/data/jobs /opt/voice-ai/data/uploads /opt/voice-ai/data/outputs /opt/voice-ai/data/models /opt/voice-ai/data/models/finetuned /opt/voice-ai/data/previews /opt/voice-ai/data/texts /opt/voice-ai/data/traces /opt/voice-ai/logs /opt/voice-ai/scripts /opt/voice-ai/config; do
   mkdir -p "$d"
 done
 
@@ -83,7 +83,7 @@ log "Normalizing dependency pins for XTTS compatibility"
 sed -i -E 's/^numpy==2\.[0-9.]+/numpy==1.26.4/' /opt/voice-ai/app/requirements.txt || true
 
 log "Stopping existing Voice AI services before venv refresh"
-for svc in voice-api.service voice-worker-preview.service voice-worker-train.service voice-worker-render.service voice-gradio.service; do
+for svc in voice-api.service voice-worker-preview.service voice-worker-train.service voice-accent.service voice-worker-render.service voice-autoscaler.service voice-gradio.service; do
   systemctl stop "$svc" 2>/dev/null || true
 done
 
@@ -147,12 +147,14 @@ install -m 0644 /opt/voice-ai/app/systemd/voice-api.service /etc/systemd/system/
 install -m 0644 /opt/voice-ai/app/systemd/voice-worker-preview.service /etc/systemd/system/voice-worker-preview.service
 install -m 0644 /opt/voice-ai/app/systemd/voice-worker-train.service /etc/systemd/system/voice-worker-train.service
 install -m 0644 /opt/voice-ai/app/systemd/voice-worker-render.service /etc/systemd/system/voice-worker-render.service
+install -m 0644 /opt/voice-ai/app/systemd/voice-accent.service /etc/systemd/system/voice-accent.service
+install -m 0644 /opt/voice-ai/app/systemd/voice-autoscaler.service /etc/systemd/system/voice-autoscaler.service
 install -m 0644 /opt/voice-ai/app/systemd/voice-gradio.service /etc/systemd/system/voice-gradio.service
 
 systemctl daemon-reload
-systemctl enable voice-api.service voice-worker-preview.service voice-worker-train.service voice-worker-render.service voice-gradio.service
+systemctl enable voice-accent.service voice-api.service voice-worker-preview.service voice-worker-train.service voice-worker-render.service voice-autoscaler.service voice-gradio.service
 # Force restart to ensure a running old process (e.g. stale venv/python path) is replaced with the newly deployed build
-systemctl restart voice-api.service voice-worker-preview.service voice-worker-train.service voice-worker-render.service voice-gradio.service
+systemctl restart voice-accent.service voice-api.service voice-worker-preview.service voice-worker-train.service voice-worker-render.service voice-autoscaler.service voice-gradio.service
 
 API_PID=$(systemctl show -p MainPID --value voice-api.service || echo 0)
 if [[ "${API_PID:-0}" -gt 0 ]]; then
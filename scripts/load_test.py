@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Drive the API -> Redis -> worker -> Postgres pipeline at a target request rate.
+
+Start the stack with TTS_BACKEND=fake (workers emit deterministic tones after
+FAKE_TTS_LATENCY_MS, plus FAKE_TTS_RTF x audio seconds) so the numbers reflect the pipeline
+rather than XTTS, then:
+  python scripts/load_test.py --voice-id <id> --rps 5 --duration 60 --mix tts=3,preview=1
+
+Requests are sent open-loop (on schedule, whether or not earlier ones finished); every
+accepted job is polled until done. The report has throughput, p50/p95/p99 latency per
+endpoint, end-to-end job latency and the Celery queue depth sampled over time.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import get_settings  # noqa: E402
+
+WORDS = ('лес', 'Машенька', 'подружки', 'грибы', 'ягоды', 'дедушка', 'бабушка', 'избушка', 'медведь', 'пирожки', 'деревня', 'короб')
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = defaultdict(list)
+        self.status = defaultdict(lambda: defaultdict(int))
+        self.jobs = defaultdict(list)
+        self.job_status = defaultdict(lambda: defaultdict(int))
+
+    def request(self, endpoint: str, seconds: float, status: int) -> None:
+        with self._lock:
+            self.latency[endpoint].append(seconds)
+            self.status[endpoint][status] += 1
+
+    def job(self, kind: str, seconds: float, status: str) -> None:
+        with self._lock:
+            self.jobs[kind].append(seconds)
+            self.job_status[kind][status] += 1
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def _text(rng: random.Random, chars: int, n: int) -> str:
+    words = [f'Запрос {n}.']
+    while sum(len(w) + 1 for w in words) < chars:
+        words.append(rng.choice(WORDS))
+    return ' '.join(words) + '.'
+
+
+def _call(session: requests.Session, rec: Recorder, endpoint: str, method: str, url: str, **kwargs):
+    started = time.perf_counter()
+    try:
+        resp = session.request(method, url, timeout=30, **kwargs)
+        status = resp.status_code
+    except requests.RequestException:
+        resp, status = None, 0
+    rec.request(endpoint, time.perf_counter() - started, status)
+    return resp
+
+
+def _run_one(kind: str, n: int, args, rec: Recorder, local: threading.local) -> None:
+    session = getattr(local, 'session', None) or requests.Session()
+    local.session = session
+    rng = random.Random(n)
+    base = args.base_url.rstrip('/')
+    if kind == 'tts':
+        body = {'voice_id': args.voice_id, 'text': _text(rng, args.tts_chars, n), 'format': args.format}
+        resp = _call(session, rec, 'POST /v1/tts', 'POST', f'{base}/v1/tts', json=body)
+    else:
+        # Unique texts keep the preview cache from answering without a worker.
+        body = {'text': _text(rng, args.preview_chars, n)}
+        resp = _call(session, rec, 'POST /v1/voices/{id}/preview', 'POST', f'{base}/v1/voices/{args.voice_id}/preview', json=body)
+    if resp is None or resp.status_code != 200:
+        return
+    job_id = resp.json()['job_id']
+    started = time.perf_counter()
+    deadline = started + args.job_timeout
+    while time.perf_counter() < deadline:
+        poll = _call(session, rec, 'GET /v1/jobs/{id}', 'GET', f'{base}/v1/jobs/{job_id}')
+        status = poll.json().get('status') if poll is not None and poll.status_code == 200 else None
+        if status in ('done', 'failed'):
+            rec.job(kind, time.perf_counter() - started, status)
+            return
+        time.sleep(args.poll_interval)
+    rec.job(kind, time.perf_counter() - started, 'timeout')
+
+
+def _sample_queues(args, stop: threading.Event, timeline: list) -> None:
+    import redis
+
+    from app.workers.autoscaler import queue_depth
+
+    settings = get_settings()
+    client = redis.Redis.from_url(args.redis_url or settings.redis_url)
+    queues = (settings.celery_preview_queue, settings.celery_render_queue)
+    started = time.perf_counter()
+    while not stop.is_set():
+        try:
+            depth = {q: queue_depth(client, q) for q in queues}
+        except redis.RedisError:
+            depth = {q: -1 for q in queues}
+        timeline.append((time.perf_counter() - started, depth))
+        stop.wait(args.sample_interval)
+
+
+def _parse_mix(spec: str) -> list[tuple[str, float]]:
+    mix = []
+    for part in spec.split(','):
+        kind, _, weight = part.partition('=')
+        if kind not in ('tts', 'preview'):
+            raise SystemExit(f'Unknown request kind in --mix: {kind}')
+        mix.append((kind, float(weight or 1)))
+    return mix
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Open-loop load test of the TTS pipeline.')
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--voice-id', required=True)
+    parser.add_argument('--rps', type=float, default=2.0, help='Target rate of new tts/preview requests')
+    parser.add_argument('--duration', type=float, default=60.0, help='Seconds to keep sending')
+    parser.add_argument('--mix', default='tts=1,preview=1', help='Weighted request kinds')
+    parser.add_argument('--tts-chars', type=int, default=600)
+    parser.add_argument('--preview-chars', type=int, default=60)
+    parser.add_argument('--format', default='wav', choices=('wav', 'mp3', 'opus'))
+    parser.add_argument('--poll-interval', type=float, default=0.5)
+    parser.add_argument('--job-timeout', type=float, default=300.0)
+    parser.add_argument('--max-clients', type=int, default=256, help='Concurrent client threads')
+    parser.add_argument('--redis-url', help='Broker to sample queue depth from (default: REDIS_URL)')
+    parser.add_argument('--sample-interval', type=float, default=1.0)
+    parser.add_argument('--json-out', help='Also write the raw report here')
+    args = parser.parse_args()
+
+    mix = _parse_mix(args.mix)
+    kinds, weights = [k for k, _ in mix], [w for _, w in mix]
+    rng = random.Random(0)
+    rec = Recorder()
+    local = threading.local()
+    stop = threading.Event()
+    timeline: list = []
+    sampler = threading.Thread(target=_sample_queues, args=(args, stop, timeline), daemon=True)
+    sampler.start()
+
+    total = int(args.rps * args.duration)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.max_clients) as pool:
+        for n in range(total):
+            delay = started + n / args.rps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(_run_one, rng.choices(kinds, weights)[0], n, args, rec, local)
+        send_sec = time.perf_counter() - started
+    elapsed = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+
+    print(f'sent={total} in {send_sec:.1f}s (target {args.rps:.2f} rps, achieved {total / max(send_sec, 1e-9):.2f}); drained after {elapsed:.1f}s')
+    print(f"{'endpoint':<32}{'count':>7}{'rps':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  status")
+    for endpoint, values in sorted(rec.latency.items()):
+        codes = ' '.join(f'{code}:{count}' for code, count in sorted(rec.status[endpoint].items()))
+        print(f'{endpoint:<32}{len(values):>7}{len(values) / elapsed:>8.2f}'
+              f'{1000 * _percentile(values, 0.5):>9.0f}{1000 * _percentile(values, 0.95):>9.0f}{1000 * _percentile(values, 0.99):>9.0f}  {codes}')
+    print(f"{'job (end to end)':<32}{'count':>7}{'jobs/s':>8}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}  status")
+    for kind, values in sorted(rec.jobs.items()):
+        done = rec.job_status[kind].get('done', 0)
+        statuses = ' '.join(f'{s}:{c}' for s, c in sorted(rec.job_status[kind].items()))
+        print(f'{kind:<32}{len(values):>7}{done / elapsed:>8.2f}'
+              f'{_percentile(values, 0.5):>9.2f}{_percentile(values, 0.95):>9.2f}{_percentile(values, 0.99):>9.2f}  {statuses}')
+    print('queue depth over time:')
+    step = max(len(timeline) // 20, 1)
+    for t, depth in timeline[::step]:
+        print(f'  t={t:>6.1f}s ' + ' '.join(f'{q}={d}' for q, d in depth.items()))
+    if timeline:
+        peaks = {q: max(d[q] for _, d in timeline) for q in timeline[0][1]}
+        print('peak depth: ' + ' '.join(f'{q}={d}' for q, d in peaks.items()))
+
+    if args.json_out:
+        report = {
+            'args': vars(args),
+            'elapsed_sec': elapsed,
+            'requests': {e: {'latency_sec': v, 'status': dict(rec.status[e])} for e, v in rec.latency.items()},
+            'jobs': {k: {'latency_sec': v, 'status': dict(rec.job_status[k])} for k, v in rec.jobs.items()},
+            'queue_depth': [{'t': t, **d} for t, d in timeline],
+        }
+        Path(args.json_out).write_text(json.dumps(report, indent=2), encoding='utf-8')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
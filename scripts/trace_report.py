@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Print traces recorded with TRACING_ENABLED=true as span trees with a latency breakdown.
+
+  python scripts/trace_report.py --trace-id <X-Trace-Id from the API response>
+  python scripts/trace_report.py --last 5          # most recent traces
+  python scripts/trace_report.py --summary         # per-span-name totals over all traces
+
+The breakdown splits a trace's wall time into API handling, broker queue wait, and task
+execution (with its synthesis/concat/transcode/db share).
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import get_settings  # noqa: E402
+
+
+def _load(traces_dir: Path) -> dict[str, list[dict]]:
+    traces = defaultdict(list)
+    for path in sorted(traces_dir.glob('spans-*.jsonl')):
+        for line in path.read_text(encoding='utf-8').splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            for rs in record.get('resourceSpans', []):
+                for ss in rs.get('scopeSpans', []):
+                    for span in ss.get('spans', []):
+                        span['start'] = int(span['startTimeUnixNano'])
+                        span['end'] = int(span['endTimeUnixNano'])
+                        span['ms'] = (span['end'] - span['start']) / 1e6
+                        traces[span['traceId']].append(span)
+    return traces
+
+
+def _attrs(span: dict) -> str:
+    pairs = []
+    for a in span.get('attributes', []):
+        value = next(iter(a['value'].values()))
+        if a['key'] != 'statement':
+            pairs.append(f"{a['key']}={value}")
+    return ' '.join(pairs)
+
+
+def _print_tree(spans: list[dict]) -> None:
+    children = defaultdict(list)
+    ids = {s['spanId'] for s in spans}
+    for s in sorted(spans, key=lambda x: x['start']):
+        children[s.get('parentSpanId') if s.get('parentSpanId') in ids else None].append(s)
+    origin = min(s['start'] for s in spans)
+
+    def walk(parent, depth):
+        db = [s for s in children[parent] if s['name'] == 'db']
+        for s in children[parent]:
+            if s['name'] == 'db':
+                continue
+            failed = ' FAILED' if s.get('status', {}).get('code') == 2 else ''
+            print(f"{(s['start'] - origin) / 1e6:>10.1f} ms  {'  ' * depth}{s['name']}  {s['ms']:.1f} ms  {_attrs(s)}{failed}")
+            walk(s['spanId'], depth + 1)
+        if db:
+            print(f"{'':>13}  {'  ' * depth}db x{len(db)}  {sum(s['ms'] for s in db):.1f} ms")
+
+    walk(None, 0)
+
+
+def _breakdown(spans: list[dict]) -> None:
+    total = (max(s['end'] for s in spans) - min(s['start'] for s in spans)) / 1e6
+    by_name = defaultdict(float)
+    for s in spans:
+        by_name[s['name'].split(' ', 1)[0] if s['name'].startswith(('task ', 'GET ', 'POST ')) else s['name']] += s['ms']
+    api = sum(v for k, v in by_name.items() if k in ('GET', 'POST'))
+    parts = [('end to end', total), ('api', api), ('queue.wait', by_name['queue.wait']), ('task', by_name['task'])]
+    parts += [(k, v) for k, v in sorted(by_name.items()) if k not in ('GET', 'POST', 'queue.wait', 'task')]
+    for name, ms in parts:
+        print(f'  {name:<18}{ms:>10.1f} ms  {100 * ms / max(total, 1e-9):>5.1f}%')
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Show recorded traces.')
+    parser.add_argument('--traces-dir', default=get_settings().traces_dir)
+    parser.add_argument('--trace-id')
+    parser.add_argument('--last', type=int, default=1)
+    parser.add_argument('--summary', action='store_true')
+    args = parser.parse_args()
+
+    traces = _load(Path(args.traces_dir))
+    if not traces:
+        raise SystemExit(f'No spans in {args.traces_dir} (is TRACING_ENABLED=true?)')
+    if args.summary:
+        stats = defaultdict(list)
+        for spans in traces.values():
+            for s in spans:
+                stats[s['name']].append(s['ms'])
+        print(f"{'span':<40}{'count':>8}{'total ms':>12}{'mean ms':>10}{'max ms':>10}")
+        for name, values in sorted(stats.items(), key=lambda kv: -sum(kv[1])):
+            print(f'{name:<40}{len(values):>8}{sum(values):>12.1f}{sum(values) / len(values):>10.1f}{max(values):>10.1f}')
+        return 0
+    if args.trace_id:
+        selected = [args.trace_id]
+    else:
+        selected = sorted(traces, key=lambda t: min(s['start'] for s in traces[t]))[-args.last:]
+    for trace_id in selected:
+        spans = traces.get(trace_id)
+        if not spans:
+            print(f'trace {trace_id}: not found')
+            continue
+        print(f'trace {trace_id}')
+        _print_tree(spans)
+        _breakdown(spans)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
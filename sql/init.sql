@@ -11,9 +11,12 @@ CREATE TABLE IF NOT EXISTS voice_samples (
     source_path VARCHAR(1024) NOT NULL,
     normalized_path VARCHAR(1024) NOT NULL,
     duration_sec DOUBLE PRECISION DEFAULT 0,
+    features JSONB DEFAULT '{}'::jsonb,
     created_at TIMESTAMP DEFAULT NOW()
 );
 
+ALTER TABLE voice_samples ADD COLUMN IF NOT EXISTS features JSONB DEFAULT '{}'::jsonb;
+
 CREATE TABLE IF NOT EXISTS voice_profiles (
     id VARCHAR PRIMARY KEY,
     voice_id VARCHAR REFERENCES voices(id),
@@ -63,16 +66,21 @@ CREATE TABLE IF NOT EXISTS ui_sessions (
     current_step INTEGER DEFAULT 1,
     selected_voice_id VARCHAR,
     selected_profile_id VARCHAR,
-    preview_text_draft TEXT DEFAULT 'Привет! Это быстрый тест.',
+    preview_text_draft TEXT DEFAULT 'Привет! Это тест вашего голоса.',
     tts_text_draft TEXT DEFAULT '',
     mode VARCHAR(16) DEFAULT 'story',
     format VARCHAR(8) DEFAULT 'wav',
     speed DOUBLE PRECISION DEFAULT 1.0,
     use_accenting BOOLEAN DEFAULT TRUE,
     use_user_overrides BOOLEAN DEFAULT TRUE,
+    accent_mode VARCHAR(32) DEFAULT 'auto_plus_overrides',
+    stress_hint_mode VARCHAR(16) DEFAULT 'none',
     active_preview_job_id VARCHAR,
     active_train_job_id VARCHAR,
     active_tts_job_id VARCHAR,
     created_at TIMESTAMP DEFAULT NOW(),
     updated_at TIMESTAMP DEFAULT NOW()
 );
+
+ALTER TABLE ui_sessions ADD COLUMN IF NOT EXISTS accent_mode VARCHAR(32) DEFAULT 'auto_plus_overrides';
+ALTER TABLE ui_sessions ADD COLUMN IF NOT EXISTS stress_hint_mode VARCHAR(16) DEFAULT 'none';